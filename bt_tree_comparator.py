@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+BehaviorTree XML Structure Comparator
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Tuple, Set, Optional
+from dataclasses import dataclass
+from enum import Enum
+from collections import Counter
+from bt_tree_parser import BTTreeParser, BTNode, NodeType, DATACLASS_SLOTS
+import difflib
+
+class ChangeType(Enum):
+    ADDED = "added"
+    REMOVED = "removed"
+    MOVED = "moved"
+    MODIFIED = "modified"
+    UNCHANGED = "unchanged"
+
+@dataclass(**DATACLASS_SLOTS)
+class NodeChange:
+    """Represents a change to a node"""
+    change_type: ChangeType
+    old_node: Optional[BTNode] = None
+    new_node: Optional[BTNode] = None
+    old_path: Optional[str] = None
+    new_path: Optional[str] = None
+    attribute_changes: Dict[str, Tuple[str, str]] = None
+
+# One worker shared by every compare_files call; its thread starts on the first submit
+_PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bt-parse')
+
+@lru_cache(maxsize=16)
+def _parse_cached(file_path: str, mtime_ns: int, size: int) -> Dict[str, BTNode]:
+    """Parse a file once per (path, mtime, size); the stat fields only key the cache"""
+    # Every caller gets the same BTNode objects, so the trees are read-only: the parser leaves
+    # children as tuples and attributes as read-only mappings
+    return BTTreeParser().parse_file(file_path)
+
+class BTTreeComparator:
+    """Compare two BehaviorTree XML structures"""
+
+    def __init__(self):
+        self.changes = []
+        self.unchanged_count = 0
+        self._removed_idx = {}
+        self._added_idx = {}
+
+    def compare_files(self, old_file: str, new_file: str, tree_id: str = None) -> List[NodeChange]:
+        """Compare two BehaviorTree XML files"""
+
+        # Parse both files side by side (reused while the files are unchanged on disk): the new
+        # file on the shared worker, the old one on this thread
+        new_future = _PARSE_EXECUTOR.submit(self._parse_file, new_file)
+        old_trees = self._parse_file(old_file)
+        new_trees = new_future.result()
+
+        # Select tree to compare
+        if tree_id is None:
+            # Use MainTree or first available tree
+            old_tree_id = 'MainTree' if 'MainTree' in old_trees else list(old_trees.keys())[0]
+            new_tree_id = 'MainTree' if 'MainTree' in new_trees else list(new_trees.keys())[0]
+        else:
+            old_tree_id = new_tree_id = tree_id
+
+        if old_tree_id not in old_trees:
+            raise ValueError(f"Tree '{old_tree_id}' not found in old file")
+        if new_tree_id not in new_trees:
+            raise ValueError(f"Tree '{new_tree_id}' not found in new file")
+
+        return self.compare_trees(old_trees[old_tree_id], new_trees[new_tree_id])
+
+    def _parse_file(self, file_path: str) -> Dict[str, BTNode]:
+        """Parse a file, reusing the cached trees if it has not changed since"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            # Let the parser report the missing file
+            return BTTreeParser().parse_file(file_path)
+
+        return _parse_cached(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+    def compare_trees(self, old_root: BTNode, new_root: BTNode) -> List[NodeChange]:
+        """Compare two tree structures"""
+        self.changes = []
+        self.unchanged_count = 0
+        self._removed_idx = {}
+        self._added_idx = {}
+
+        if old_root.unique_paths and new_root.unique_paths:
+            old_nodes, new_nodes = self._compare_pruned(old_root, new_root)
+        else:
+            # A shared path maps to one node only, so identical subtrees cannot stand in for it
+            old_nodes, new_nodes = self._compare_by_path(old_root, new_root)
+
+        # Detect moved nodes (same content, different path)
+        self._detect_moved_nodes(old_nodes, new_nodes, old_root, new_root)
+
+        return self.changes
+
+    def _compare_pruned(self, old_root: BTNode,
+                        new_root: BTNode) -> Tuple[Dict[str, BTNode], Dict[str, BTNode]]:
+        """Compare trees with unique paths, skipping identical subtrees; returns the nodes outside them"""
+        # Nodes outside identical subtrees, collected for move detection
+        old_nodes = {}
+        new_nodes = {}
+
+        # Walk both trees in lockstep, one pair of sibling lists at a time
+        pending = [([old_root], [new_root])]
+        pop, push = pending.pop, pending.append
+        compare_nodes = self._compare_nodes
+        while pending:
+            old_children, new_children = pop()
+
+            if [c.path for c in old_children] == [c.path for c in new_children]:
+                # Same shape - siblings pair up by position
+                pairs, removed, added = zip(old_children, new_children), (), ()
+            else:
+                pairs, removed, added = self._match_children(old_children, new_children)
+
+            for old_node, new_node in pairs:
+                path = old_node.path
+
+                if old_node.merkle == new_node.merkle:
+                    # Identical subtree - only count its nodes, no records are kept
+                    self.unchanged_count += old_node.size
+                    continue
+
+                old_nodes[path] = old_node
+                new_nodes[path] = new_node
+                compare_nodes(old_node, new_node, path)
+                push((old_node.children, new_node.children))
+
+            # Every node of an unmatched subtree was removed or added
+            for old_child in removed:
+                node_map = self._create_node_map(old_child)
+                old_nodes.update(node_map)
+                self._record_nodes(node_map, ChangeType.REMOVED)
+            for new_child in added:
+                node_map = self._create_node_map(new_child)
+                new_nodes.update(node_map)
+                self._record_nodes(node_map, ChangeType.ADDED)
+
+        return old_nodes, new_nodes
+
+    def _compare_by_path(self, old_root: BTNode,
+                         new_root: BTNode) -> Tuple[Dict[str, BTNode], Dict[str, BTNode]]:
+        """Compare the nodes of two trees path by path, returning both path maps"""
+        old_nodes = self._create_node_map(old_root)
+        new_nodes = self._create_node_map(new_root)
+
+        compare_nodes = self._compare_nodes
+        for path, old_node in old_nodes.items():
+            new_node = new_nodes.get(path)
+            if new_node is not None:
+                compare_nodes(old_node, new_node, path)
+
+        self._record_nodes({path: node for path, node in old_nodes.items() if path not in new_nodes},
+                           ChangeType.REMOVED)
+        self._record_nodes({path: node for path, node in new_nodes.items() if path not in old_nodes},
+                           ChangeType.ADDED)
+
+        return old_nodes, new_nodes
+
+    def _match_children(self, old_children: List[BTNode],
+                        new_children: List[BTNode]) -> Tuple[List[Tuple[BTNode, BTNode]], List[BTNode], List[BTNode]]:
+        """Pair siblings by path (tag plus ID or same-tag index), returning pairs, removed and added"""
+        new_by_path = {child.path: child for child in new_children}
+
+        pairs = []
+        removed = []
+        for child in old_children:
+            new_child = new_by_path.pop(child.path, None)
+            if new_child is not None:
+                pairs.append((child, new_child))
+            else:
+                removed.append(child)
+
+        # Whatever is left had no counterpart among the old siblings
+        added = [child for child in new_children if child.path in new_by_path]
+
+        return pairs, removed, added
+
+    def _record_nodes(self, node_map: Dict[str, BTNode], change_type: ChangeType):
+        """Record every node of a path map as REMOVED or ADDED"""
+        changes = self.changes
+
+        if change_type == ChangeType.REMOVED:
+            removed_idx = self._removed_idx
+            for path, node in node_map.items():
+                removed_idx[path] = len(changes)
+                changes.append(NodeChange(
+                    change_type=ChangeType.REMOVED,
+                    old_node=node,
+                    old_path=path
+                ))
+        else:
+            added_idx = self._added_idx
+            for path, node in node_map.items():
+                added_idx[path] = len(changes)
+                changes.append(NodeChange(
+                    change_type=ChangeType.ADDED,
+                    new_node=node,
+                    new_path=path
+                ))
+
+    def _create_node_map(self, root: BTNode) -> Dict[str, BTNode]:
+        """Create a map of path -> node for efficient lookup"""
+        node_map, stack = {}, [root]
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            node = pop()
+            node_map[node.path] = node
+            # Reverse push keeps pre-order, so duplicate paths resolve as before
+            extend(reversed(node.children))
+        return node_map
+
+    def _compare_nodes(self, old_node: BTNode, new_node: BTNode, path: str):
+        """Compare two nodes at the same path"""
+        changes = {}
+
+        # Compare basic properties
+        if old_node.tag != new_node.tag:
+            changes['tag'] = (old_node.tag, new_node.tag)
+        if old_node.node_type != new_node.node_type:
+            changes['node_type'] = (old_node.node_type.value, new_node.node_type.value)
+
+        # Compare attributes - identical dicts (the common case) need no per-key work
+        attr_changes = {}
+        old_attrs = old_node.attributes
+        new_attrs = new_node.attributes
+
+        if old_attrs != new_attrs:
+            for attr in old_attrs.keys() | new_attrs.keys():
+                old_val = old_attrs.get(attr, '')
+                new_val = new_attrs.get(attr, '')
+                if old_val != new_val:
+                    attr_changes[attr] = (old_val, new_val)
+
+        if changes or attr_changes:
+            self.changes.append(NodeChange(
+                change_type=ChangeType.MODIFIED,
+                old_node=old_node,
+                new_node=new_node,
+                old_path=path,
+                new_path=path,
+                attribute_changes=attr_changes
+            ))
+        else:
+            self.unchanged_count += 1
+
+    def _detect_moved_nodes(self, old_nodes: Dict[str, BTNode], new_nodes: Dict[str, BTNode],
+                            old_root: BTNode, new_root: BTNode):
+        """Detect nodes that were moved (same signature, different path)"""
+        # Create signature maps
+        old_signatures = {}
+        new_signatures = {}
+        node_signature = self._node_signature
+
+        for path, node in old_nodes.items():
+            old_signatures.setdefault(node_signature(node), []).append((path, node))
+
+        for path, node in new_nodes.items():
+            new_signatures.setdefault(node_signature(node), []).append((path, node))
+
+        # Signature counts over the whole trees, built only once a candidate move turns up
+        tree_signatures = None
+
+        # Find potential moves
+        for sig in old_signatures:
+            if sig in new_signatures:
+                old_instances = old_signatures[sig]
+                new_instances = new_signatures[sig]
+
+                # Simple heuristic: if a signature appears once in each tree at different paths
+                if len(old_instances) == 1 and len(new_instances) == 1:
+                    old_path, old_node = old_instances[0]
+                    new_path, new_node = new_instances[0]
+
+                    if old_path != new_path:
+                        # The node maps leave out pruned identical subtrees, which may hold the
+                        # same signature again, so uniqueness is checked against the whole trees
+                        if tree_signatures is None:
+                            tree_signatures = (self._signature_counts(old_root),
+                                               self._signature_counts(new_root))
+                        if tree_signatures[0][sig] != 1 or tree_signatures[1][sig] != 1:
+                            continue
+
+                        # Blank out the ADDED/REMOVED entries and add MOVED
+                        removed_idx = self._removed_idx.pop(old_path, None)
+                        if removed_idx is not None:
+                            self.changes[removed_idx] = None
+                        added_idx = self._added_idx.pop(new_path, None)
+                        if added_idx is not None:
+                            self.changes[added_idx] = None
+
+                        self.changes.append(NodeChange(
+                            change_type=ChangeType.MOVED,
+                            old_node=old_node,
+                            new_node=new_node,
+                            old_path=old_path,
+                            new_path=new_path
+                        ))
+
+        # Compact the slots vacated by moves in a single pass
+        self.changes = [c for c in self.changes if c is not None]
+
+    def _signature_counts(self, root: BTNode) -> Counter:
+        """Count the signatures of a whole tree, one node per path as in the path maps"""
+        node_signature = self._node_signature
+        return Counter(node_signature(node) for node in self._create_node_map(root).values())
+
+    def _node_signature(self, node: BTNode) -> str:
+        """Return the signature used to detect moves (tag, type and key attributes)"""
+        # Computed once by the parser
+        return node.signature
+
+    def generate_diff_report(self, old_file: str, new_file: str) -> str:
+        """Generate a human-readable diff report"""
+        report = []
+        report.append("BehaviorTree XML Structural Diff")
+        report.append("================================")
+        report.append(f"Old file: {old_file}")
+        report.append(f"New file: {new_file}")
+        report.append("")
+
+        # Summary
+        counts = Counter(c.change_type for c in self.changes)
+
+        report.append("Summary:")
+        report.append(f"  Added: {counts[ChangeType.ADDED]}")
+        report.append(f"  Removed: {counts[ChangeType.REMOVED]}")
+        report.append(f"  Modified: {counts[ChangeType.MODIFIED]}")
+        report.append(f"  Moved: {counts[ChangeType.MOVED]}")
+        report.append(f"  Unchanged: {self.unchanged_count}")
+        report.append("")
+
+        # Detailed changes
+        for change in self.changes:
+            report.append(self._format_change(change))
+            report.append("")
+
+        return "\n".join(report)
+
+    def _format_change(self, change: NodeChange) -> str:
+        """Format a single change for the report"""
+        if change.change_type == ChangeType.ADDED:
+            return f"+ ADDED: {change.new_path}\n  {self._format_node_info(change.new_node)}"
+
+        elif change.change_type == ChangeType.REMOVED:
+            return f"- REMOVED: {change.old_path}\n  {self._format_node_info(change.old_node)}"
+
+        elif change.change_type == ChangeType.MOVED:
+            return f"→ MOVED: {change.old_path} → {change.new_path}\n  {self._format_node_info(change.new_node)}"
+
+        elif change.change_type == ChangeType.MODIFIED:
+            parts = [f"* MODIFIED: {change.old_path}"]
+            if change.attribute_changes:
+                parts.append("  Attribute changes:")
+                parts.extend(f"    {attr}: '{old_val}' → '{new_val}'"
+                             for attr, (old_val, new_val) in change.attribute_changes.items())
+            return "\n".join(parts)
+
+        return ""
+
+    def _format_node_info(self, node: BTNode) -> str:
+        """Format node information"""
+        info = f"{node.tag} ({node.node_type.value})"
+        if node.attributes:
+            key_attrs = ['ID', 'name', 'sub_tree_name']
+            attr_info = []
+            for attr in key_attrs:
+                if attr in node.attributes:
+                    attr_info.append(f"{attr}='{node.attributes[attr]}'")
+            if attr_info:
+                info += f" [{', '.join(attr_info)}]"
+        return info
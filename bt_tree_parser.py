@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+BehaviorTree XML Parser for structural analysis
+"""
+
+import hashlib
+import io
+import sys
+from collections import Counter, defaultdict
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from dataclasses import dataclass
+from enum import Enum
+
+try:
+    from lxml import etree as ET
+    # lxml-only parser options: lift the depth/size limits for huge trees and skip
+    # whitespace-only text between elements
+    _ITERPARSE_OPTIONS = {'huge_tree': True, 'remove_blank_text': True}
+except ImportError:
+    # Fall back to the standard library parser when lxml is not installed
+    import xml.etree.ElementTree as ET
+    _ITERPARSE_OPTIONS = {}
+
+# Python 3.10+ can generate __slots__ for dataclasses, dropping the per-instance __dict__
+DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+class NodeType(Enum):
+    CONTROL = "control"
+    ACTION = "action"
+    CONDITION = "condition"
+    DECORATOR = "decorator"
+    SUBTREE = "subtree"
+
+@dataclass(**DATACLASS_SLOTS)
+class BTNode:
+    """Represents a single node in the behavior tree"""
+    id: str
+    node_type: NodeType
+    tag: str
+    attributes: Mapping[str, str]
+    children: Sequence['BTNode']
+    parent: Optional['BTNode'] = None
+    depth: int = 0
+    path: str = ""
+    merkle: bytes = b''
+    signature: str = ""
+    size: int = 1
+    unique_paths: bool = True
+
+class BTTreeParser:
+    """Parser for BehaviorTree.CPP XML files"""
+
+    # Control nodes that have multiple children
+    CONTROL_NODES = {
+        'Sequence', 'Fallback', 'Parallel', 'ReactiveSequence', 'ReactiveFallback',
+        'IfThenElse', 'WhileDoElse', 'Switch', 'Selector', 'Control',
+        'ForEach', 'MultiRobotControl', 'StatefulActionNode'
+    }
+
+    DECORATOR_NODES = {
+        'Inverter', 'ForceSuccess', 'ForceFailure', 'Repeat', 'Retry',
+        'Timeout', 'Delay', 'RetryUntilSuccessful', 'KeepRunningUntilFailure',
+        'Decorator', 'ReportFailure', 'BlackboardPrecondition',
+        'BlackboardPostCheckBool', 'BlackboardPostCheckInt', 'BlackboardPostCheckString'
+    }
+
+    # Tag -> node type lookup; any tag not listed here is an action node
+    TAG_TO_TYPE = {
+        **{tag: NodeType.CONTROL for tag in CONTROL_NODES},
+        **{tag: NodeType.DECORATOR for tag in DECORATOR_NODES},
+        'SubTree': NodeType.SUBTREE,
+        'Condition': NodeType.CONDITION
+    }
+
+    def __init__(self):
+        self.trees = {}
+        self.all_nodes = []
+        self._attribute_dicts = {}
+
+    def parse_file(self, file_path: str) -> Dict[str, BTNode]:
+        """Parse a BehaviorTree XML file and return tree structures"""
+        try:
+            return self._parse_source(file_path)
+        except ET.ParseError as e:
+            raise ValueError(f"XML parsing error: {e}")
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+    def parse_string(self, content: Union[str, bytes]) -> Dict[str, BTNode]:
+        """Parse BehaviorTree XML content held in memory and return tree structures"""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        try:
+            return self._parse_source(io.BytesIO(content))
+        except ET.ParseError as e:
+            raise ValueError(f"XML parsing error: {e}")
+
+    def _parse_source(self, source) -> Dict[str, BTNode]:
+        """Build BTNodes from a file path or binary file object in a single streaming pass"""
+        # The stack holds the open nodes together with per-tag counts of the children seen so far
+        stack = []
+
+        for event, element in ET.iterparse(source, events=('start', 'end'), **_ITERPARSE_OPTIONS):
+            if event == 'start':
+                if element.tag == 'BehaviorTree':
+                    # Nested BehaviorTree definitions become trees of their own
+                    tree_id = element.get('ID', 'MainTree')
+                    node = self._create_node(element, None, 0)
+                    node.id = tree_id
+                    self.trees[tree_id] = node
+                    stack.append((node, defaultdict(int)))
+                elif stack:
+                    parent, sibling_counts = stack[-1]
+                    sibling_index = sibling_counts[element.tag]
+                    sibling_counts[element.tag] = sibling_index + 1
+
+                    node = self._create_node(element, parent, parent.depth + 1, sibling_index)
+                    parent.children.append(node)
+                    stack.append((node, defaultdict(int)))
+            elif stack:
+                self._finish_node(stack.pop()[0])
+                # Drop the element's contents; everything needed is on the BTNode
+                element.clear()
+
+        return self.trees
+
+    def _create_node(self, element: ET.Element, parent: Optional[BTNode], depth: int,
+                     sibling_index: int = 0) -> BTNode:
+        """Create a BTNode for an XML element; children are attached as parsing proceeds"""
+
+        # Intern tags and attribute names - the same few strings repeat on every node
+        tag = sys.intern(element.tag)
+
+        # Nodes with identical attributes share one mapping; it is a read-only proxy so a
+        # write through one node fails instead of changing every other node
+        attr_items = tuple(element.attrib.items())
+        attributes = self._attribute_dicts.get(attr_items)
+        if attributes is None:
+            attributes = MappingProxyType({sys.intern(k): v for k, v in attr_items})
+            self._attribute_dicts[attr_items] = attributes
+
+        # Determine node type
+        node_type = self._classify_node(tag)
+
+        # Create node
+        node = BTNode(
+            id=element.get('ID', tag),
+            node_type=node_type,
+            tag=tag,
+            attributes=attributes,
+            children=[],
+            parent=parent,
+            depth=depth,
+            path=self._generate_path(element, parent, sibling_index)
+        )
+
+        # Signature used by the comparator to detect moved nodes
+        node.signature = f"{node.tag}({node_type.value}):" + ":".join(
+            f"{attr}={attributes[attr]}" for attr in ('ID', 'name', 'sub_tree_name') if attr in attributes
+        )
+
+        return node
+
+    def _finish_node(self, node: BTNode):
+        """Finalize a node once all of its children have been parsed"""
+        # Hash the subtree bottom-up so identical subtrees can be skipped when comparing
+        merkle = hashlib.blake2b(
+            f"{node.tag}|{node.node_type.value}|{sorted(node.attributes.items())}|".encode(),
+            digest_size=16
+        )
+        size = 1
+        unique_paths = True
+        for child in node.children:
+            merkle.update(child.merkle)
+            size += child.size
+            unique_paths = unique_paths and child.unique_paths
+
+        node.merkle = merkle.digest()
+        node.size = size
+        # Paths repeat when siblings share a tag and ID; the comparator then matches by path map
+        node.unique_paths = unique_paths and len({child.path for child in node.children}) == len(node.children)
+        # Parsed trees are shared by the comparator's parse cache, so children end up read-only
+        node.children = tuple(node.children)
+
+        self.all_nodes.append(node)
+
+    def _classify_node(self, tag: str) -> NodeType:
+        """Classify node type based on XML tag"""
+        # Action* tags, AlwaysSuccess/AlwaysFailure and custom nodes all default to action
+        return self.TAG_TO_TYPE.get(tag, NodeType.ACTION)
+
+    def _generate_path(self, element: ET.Element, parent: Optional[BTNode], sibling_index: int = 0) -> str:
+        """Generate a unique path for the node from its precomputed same-tag sibling index"""
+        if parent is None:
+            return sys.intern(element.tag)
+
+        # Include ID attribute if present for better identification. Paths are interned so
+        # equal paths from the old and new trees are the same object when compared
+        node_id = element.get('ID', '')
+        if node_id:
+            return sys.intern(f"{parent.path}/{element.tag}[@ID='{node_id}']")
+        else:
+            return sys.intern(f"{parent.path}/{element.tag}[{sibling_index}]")
+
+    def get_tree_structure(self, tree_id: str = None) -> List[str]:
+        """Get a text representation of the tree structure"""
+        if tree_id is None:
+            tree_id = list(self.trees.keys())[0] if self.trees else None
+
+        if tree_id not in self.trees:
+            return ["Tree not found"]
+
+        root = self.trees[tree_id]
+        result = []
+        self._build_structure_text(root, result, "")
+        return result
+
+    def _build_structure_text(self, node: BTNode, result: List[str], prefix: str):
+        """Build text representation of tree structure using an explicit stack"""
+        key_attrs = ['ID', 'name', 'sub_tree_name', 'service_name']
+        stack = [(node, prefix)]
+
+        while stack:
+            node, prefix = stack.pop()
+
+            # Format node info
+            attrs_str = ""
+            if node.attributes:
+                important_attrs = {k: v for k, v in node.attributes.items() if k in key_attrs}
+                if important_attrs:
+                    attrs_str = " " + " ".join(f'{k}="{v}"' for k, v in important_attrs.items())
+
+            result.append(f"{prefix}├─ {node.tag}({node.node_type.value}){attrs_str}")
+
+            # Push children in reverse so they are emitted in document order
+            last = len(node.children) - 1
+            for i in range(last, -1, -1):
+                child_prefix = prefix + ("   " if i == last else "│  ")
+                stack.append((node.children[i], child_prefix))
+
+    def get_node_statistics(self) -> Dict[str, int]:
+        """Get statistics about the parsed trees"""
+        # Count node types and track the deepest node in a single pass
+        counts = Counter()
+        max_depth = 0
+        for n in self.all_nodes:
+            counts[n.node_type] += 1
+            if n.depth > max_depth:
+                max_depth = n.depth
+
+        stats = {
+            'total_trees': len(self.trees),
+            'total_nodes': len(self.all_nodes),
+            'control_nodes': counts[NodeType.CONTROL],
+            'action_nodes': counts[NodeType.ACTION],
+            'condition_nodes': counts[NodeType.CONDITION],
+            'decorator_nodes': counts[NodeType.DECORATOR],
+            'subtree_nodes': counts[NodeType.SUBTREE],
+            'max_depth': max_depth
+        }
+        return stats
@@ -3,16 +3,171 @@
 Enhanced Branch BehaviorTree Analyzer with Interactive Tree Visualization
 """
 
+import gzip
+import hashlib
+import html
+import io
 import json
-import tempfile
+import os
+import queue
 import subprocess
+import sys
 import re
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain, groupby
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple, Union
 from tree_visualizer_enhanced import EnhancedTreeVisualizer
-from bt_tree_parser import BTTreeParser, BTNode
+from bt_tree_parser import BTTreeParser, BTNode, DATACLASS_SLOTS
 from bt_tree_comparator import BTTreeComparator
 
+try:
+    import orjson
+    
+    def _json_dumps(obj) -> str:
+        """Serialize data for embedding in a report <script>"""
+        # "</" is escaped so a string value cannot close the script element
+        return orjson.dumps(obj).decode('utf-8').replace('</', '<\\/')
+except ImportError:
+    # Fall back to the standard library, producing the same compact UTF-8 JSON as orjson
+    def _json_dumps(obj) -> str:
+        """Serialize data for embedding in a report <script>"""
+        # "</" is escaped so a string value cannot close the script element
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+
+# Patterns used on every diff line, compiled once
+_TAG_RE = re.compile(r'<(\w+)')
+_ID_RE = re.compile(r'ID="([^"]*)"')
+_ATTR_RE = re.compile(r'(\w+)="([^"]*)"')
+_SUBTREE_RE = re.compile(r'<SubTree\s+ID="([^"]+)"[^>]*(?:\s+_description="([^"]*)")?[^>]*/?>', re.IGNORECASE)
+
+# Tags whose opening element marks a BehaviorTree node line in a diff
+_BT_TAGS = [
+    'Action', 'Condition', 'Sequence', 'Fallback', 'Parallel', 
+    'ForceSuccess', 'ForceFailure', 'Inverter', 'Retry', 'Timeout',
+    'SubTree', 'Decorator', 'Control', 'SetBlackboard', 'AlwaysSuccess', 
+    'AlwaysFailure', 'IfThenElse', 'RetryUntilSuccessful'
+]
+# Prefix match (no word boundary), same as testing `'<' + tag in line` for each tag;
+# group 1 captures the full tag name
+_BT_TAG_RE = re.compile(r'<((?:' + '|'.join(_BT_TAGS) + r')\w*)')
+
+# Tag groups used to decide whether a changed diff line is a meaningful node change
+_PRIMARY_TAGS = frozenset({'Action', 'Condition', 'SubTree'})
+_CONTROL_TAGS = frozenset({'Sequence', 'Fallback', 'Parallel'})
+_DECORATOR_TAGS = frozenset({'ForceSuccess', 'ForceFailure', 'Inverter', 'Retry', 'Timeout'})
+
+# CSS classes of the change list entries in a file section, by change type
+_CHANGE_CLASS = {
+    'ADDED': 'change-added',
+    'REMOVED': 'change-removed',
+    'MODIFIED': 'change-modified',
+    'MOVED': 'change-moved'
+}
+_SUBTREE_CHANGE_CLASS = {
+    'SUBTREE_ADDED': 'change-subtree change-added',
+    'SUBTREE_REMOVED': 'change-subtree change-removed',
+    'SUBTREE_MODIFIED': 'change-subtree change-modified'
+}
+
+# git C-quotes paths with control characters, '"' or '\\' in diff headers, even with
+# core.quotePath=false: the first quoted token and the escapes used inside it
+_QUOTED_PATH_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_QUOTED_PATH_ESCAPE_RE = re.compile(rb'\\([0-7]{3}|.)', re.DOTALL)
+_QUOTED_PATH_ESCAPES = {
+    b'a': b'\a', b'b': b'\b', b't': b'\t', b'n': b'\n', b'v': b'\v', b'f': b'\f', b'r': b'\r'
+}
+
+def _diff_header_path(header: str) -> Optional[str]:
+    """Return the source path of a `diff --git` header, or None if it is not one"""
+    header = header.rstrip('\n')[len('diff --git '):]
+    if header.startswith('"'):
+        # "a/<path>" "b/<path>": decode the escapes (octal ones are raw UTF-8 bytes)
+        match = _QUOTED_PATH_RE.match(header)
+        if match is None:
+            return None
+        path = _QUOTED_PATH_ESCAPE_RE.sub(
+            lambda m: bytes([int(m[1], 8)]) if len(m[1]) == 3 else _QUOTED_PATH_ESCAPES.get(m[1], m[1]),
+            match[1].encode('utf-8')
+        ).decode('utf-8', 'surrogateescape')
+    elif header.startswith('a/'):
+        # Without renames the header is "a/<path> b/<path>", so the path is the first half
+        # of it (this also copes with spaces in paths)
+        path = header[:(len(header) - 1) // 2]
+    else:
+        return None
+    return path[len('a/'):]
+
+def _read_stderr(stderr_file) -> str:
+    """Return what a git process wrote to its temporary stderr file"""
+    stderr_file.seek(0)
+    return stderr_file.read().decode('utf-8', errors='replace')
+
+class _BackgroundWriter:
+    """Text sink that writes to a stream on a worker thread, so building the report overlaps the I/O"""
+    
+    def __init__(self, stream: TextIO, max_pending: int = 64):
+        self._stream = stream
+        # Bounded, so a slow disk holds back generation instead of buffering the whole report
+        self._queue = queue.Queue(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._done = self._executor.submit(self._drain)
+    
+    def _drain(self):
+        """Write queued chunks until the closing sentinel arrives"""
+        error = None
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            # After a failure keep emptying the queue so write() never blocks; close() raises
+            if error is None:
+                try:
+                    self._stream.write(chunk)
+                except Exception as e:
+                    error = e
+        if error is not None:
+            raise error
+    
+    def write(self, text: str):
+        self._queue.put(text)
+    
+    def close(self):
+        """Wait for every queued chunk to be written, re-raising any write error"""
+        self._queue.put(None)
+        self._executor.shutdown()
+        self._done.result()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # Already failing; just stop the worker
+            self._queue.put(None)
+            self._executor.shutdown()
+
+@dataclass(**DATACLASS_SLOTS)
+class FileAnalysis:
+    """Result of analyzing one changed BehaviorTree file"""
+    file_path: str
+    has_structural_changes: bool = False
+    change_type: str = 'MODIFIED'
+    changes: List[Dict] = field(default_factory=list)
+    subtree_changes: List[Dict] = field(default_factory=list)
+    tree_data: Optional[Dict] = None
+    error: Optional[str] = None
+    # Lines the analysis would have printed; the caller prints them in file order
+    log: List[str] = field(default_factory=list)
+
 class EnhancedBranchBTAnalyzer:
     """Analyze all BehaviorTree changes between branches with enhanced tree visualization"""
     
@@ -20,6 +175,37 @@ class EnhancedBranchBTAnalyzer:
         self.repo_path = Path(repo_path).resolve()
         self.tree_visualizer = EnhancedTreeVisualizer()
         self.git_changes = []
+        # Each thread gets its own cat-file process; all of them are tracked for close()
+        self._local = threading.local()
+        self._cat_files = []
+        self._cat_files_lock = threading.Lock()
+        self._blob_cache: Dict[Tuple[str, str], Tuple[Optional[str], Optional[bytes]]] = {}
+        self._parsed_tree_cache: Dict[str, Dict[str, BTNode]] = {}
+        self._tree_node_ids: Dict[int, Tuple[BTNode, frozenset]] = {}
+        self._subtrees_by_branch_dir: Dict[Tuple[str, Path], Dict[str, BTNode]] = {}
+        self._ls_tree_cache: Dict[Tuple[str, str], List[str]] = {}
+    
+    def __del__(self):
+        self.close()
+    
+    def close(self):
+        """Shut down the persistent git cat-file processes"""
+        lock = getattr(self, '_cat_files_lock', None)
+        if lock is None:
+            return
+        with lock:
+            cat_files, self._cat_files = self._cat_files, []
+        for cat_file in cat_files:
+            self._stop_cat_file(cat_file)
+    
+    @staticmethod
+    def _stop_cat_file(cat_file: subprocess.Popen):
+        """Let a cat-file process exit by closing its input, killing it if it does not"""
+        try:
+            cat_file.stdin.close()
+            cat_file.wait(timeout=5)
+        except Exception:
+            cat_file.kill()
     
     def _is_git_repo(self) -> bool:
         """Check if the current directory is a git repository"""
@@ -30,31 +216,35 @@ class EnhancedBranchBTAnalyzer:
         except:
             return False
     
-    def _find_tree_with_changes(self, source_trees: Dict, target_trees: Dict, git_changes: List[Dict]) -> str:
-        """Find the tree that actually contains the detected changes"""
+    def _find_tree_with_changes(self, source_trees: Dict, target_trees: Dict, git_changes: List[Dict],
+                                log: Optional[List[str]] = None) -> str:
+        """Find the tree that actually contains the detected changes, logging to log if given"""
+        emit = print if log is None else log.append
+        
+        # The changed XML line holds the tag, ID and every attribute the description is built
+        # from, so search it directly rather than the repr of each whole change dict
+        change_lines = [change.get('full_line', '') for change in git_changes]
         
         # Check for specific node combinations to determine the correct tree
-        has_manipulator_reboot = any('ManipulatorRebootDxlAction' in str(change) for change in git_changes)
-        has_publish_log = any('PublishLogAction' in str(change) and '매니퓰레이터 Reboot' in str(change) for change in git_changes)
+        has_manipulator_reboot = any('ManipulatorRebootDxlAction' in line for line in change_lines)
+        has_publish_log = any('PublishLogAction' in line and '매니퓰레이터 Reboot' in line for line in change_lines)
         
         # If we have ManipulatorRebootDxlAction or PublishLogAction with "매니퓰레이터 Reboot", prefer MainTree
         if (has_manipulator_reboot or has_publish_log) and 'MainTree' in target_trees:
-            print(f"🔍 Using MainTree (found ManipulatorRebootDxlAction or PublishLogAction with 매니퓰레이터 Reboot)")
+            emit(f"🔍 Using MainTree (found ManipulatorRebootDxlAction or PublishLogAction with 매니퓰레이터 Reboot)")
             return 'MainTree'
         
         # Targeted fixes for specific cases - lower priority
-        if 'MoveToNextSector' in target_trees:
-            for change in git_changes:
-                if 'WaitAction' in str(change) and not has_manipulator_reboot and not has_publish_log:
-                    print(f"🔍 Using MoveToNextSector tree (targeted fix for WaitAction)")
-                    return 'MoveToNextSector'
+        if 'MoveToNextSector' in target_trees and not has_manipulator_reboot and not has_publish_log:
+            if any('WaitAction' in line for line in change_lines):
+                emit(f"🔍 Using MoveToNextSector tree (targeted fix for WaitAction)")
+                return 'MoveToNextSector'
         
         # New fix: for bell_perceptor deletion, use False_perceptor tree
         if 'False_perceptor' in target_trees:
-            for change in git_changes:
-                if 'bell_perceptor' in str(change):
-                    print(f"🔍 Using False_perceptor tree (targeted fix for bell_perceptor)")
-                    return 'False_perceptor'
+            if any('bell_perceptor' in line for line in change_lines):
+                emit(f"🔍 Using False_perceptor tree (targeted fix for bell_perceptor)")
+                return 'False_perceptor'
         
         # If MainTree exists, prefer it
         if 'MainTree' in source_trees:
@@ -71,142 +261,213 @@ class EnhancedBranchBTAnalyzer:
             if 'WaitAction' in desc:
                 change_node_ids.add('WaitAction')
         
-        print(f"🔍 Looking for trees containing nodes: {change_node_ids}")
-        print(f"🔍 Available trees: {list(target_trees.keys())}")
+        emit(f"🔍 Looking for trees containing nodes: {change_node_ids}")
+        change_node_ids = frozenset(change_node_ids)
+        emit(f"🔍 Available trees: {list(target_trees.keys())}")
         
         # Check each tree to find one that should contain these nodes
         for tree_id, tree in target_trees.items():
-            print(f"🔍 Checking tree: {tree_id}")
+            emit(f"🔍 Checking tree: {tree_id}")
             if self._tree_contains_nodes(tree, change_node_ids):
-                print(f"✅ Found changes in tree: {tree_id}")
+                emit(f"✅ Found changes in tree: {tree_id}")
                 return tree_id
             else:
-                print(f"❌ Tree {tree_id} does not contain target nodes")
+                emit(f"❌ Tree {tree_id} does not contain target nodes")
         
         # If no specific match found, return first tree
         first_tree = list(source_trees.keys())[0] if source_trees else list(target_trees.keys())[0]
-        print(f"🔍 No specific match found, using first tree: {first_tree}")
+        emit(f"🔍 No specific match found, using first tree: {first_tree}")
         return first_tree
     
-    def _tree_contains_nodes(self, tree: BTNode, node_ids: set) -> bool:
+    def _tree_contains_nodes(self, tree: BTNode, node_ids: frozenset) -> bool:
         """Check if tree contains any of the specified node IDs"""
         if not node_ids:
             return False
-            
-        def check_node(node: BTNode) -> bool:
-            # Check node ID
-            node_id = node.attributes.get('ID', '')
-            if node_id in node_ids:
-                return True
-            
-            # Check children recursively
-            for child in node.children:
-                if check_node(child):
-                    return True
-            return False
-        
-        return check_node(tree)
+        return not node_ids.isdisjoint(self._get_tree_node_ids(tree))
+    
+    def _get_tree_node_ids(self, tree: BTNode) -> frozenset:
+        """Return the ID attributes of every node in a tree, collected once per tree"""
+        # Parsed trees are cached and shared across files, so the same roots come back often.
+        # The entry keeps the tree alive, so its id() cannot be reused by another object
+        cached = self._tree_node_ids.get(id(tree))
+        if cached is not None:
+            return cached[1]
+        
+        node_ids = set()
+        stack = [tree]
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            node = pop()
+            node_ids.add(node.attributes.get('ID', ''))
+            extend(node.children)
+        
+        node_ids = frozenset(node_ids)
+        self._tree_node_ids[id(tree)] = (tree, node_ids)
+        return node_ids
+    
+    def _get_cat_file(self) -> subprocess.Popen:
+        """Return this thread's persistent `git cat-file --batch` process, starting it on first use"""
+        cat_file = getattr(self._local, 'cat_file', None)
+        if cat_file is None or cat_file.poll() is not None:
+            cat_file = subprocess.Popen(
+                ['git', 'cat-file', '--batch'],
+                cwd=self.repo_path, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+            self._local.cat_file = cat_file
+            with self._cat_files_lock:
+                self._cat_files.append(cat_file)
+        return cat_file
     
     def get_file_at_branch(self, file_path: str, branch: str) -> str:
         """Get file content at specific branch"""
+        return self._get_file_with_sha(file_path, branch)[1]
+    
+    def _get_file_with_sha(self, file_path: str, branch: str) -> Tuple[Optional[str], Optional[str]]:
+        """Get the blob SHA and decoded file content at specific branch"""
+        sha, content = self._read_object(file_path, branch)
+        return sha, content.decode('utf-8', errors='replace') if content is not None else None
+    
+    def _read_blob(self, file_path: str, branch: str) -> Optional[bytes]:
+        """Get raw file content at specific branch, or None if it does not exist there"""
+        return self._read_object(file_path, branch)[1]
+    
+    def _read_object(self, file_path: str, branch: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """Get the blob SHA and raw file content at specific branch, or (None, None)"""
+        # The BT-file sniff and the later tree parse read the same blobs; fetch them once per run
+        key = (branch, file_path)
+        cached = self._blob_cache.get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            result = subprocess.run([
-                'git', 'show', f'{branch}:{file_path}'
-            ], cwd=self.repo_path, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                return None
-            
-            return result.stdout
+            cached = self._blob_cache[key] = self._fetch_object(file_path, branch)
+            return cached
         except Exception:
-            return None
+            # Drop this thread's process so its next read starts a fresh one
+            cat_file, self._local.cat_file = getattr(self._local, 'cat_file', None), None
+            if cat_file is not None:
+                self._stop_cat_file(cat_file)
+            return None, None
+    
+    def _fetch_object(self, file_path: str, branch: str) -> Tuple[Optional[str], Optional[bytes]]:
+        """Read a blob through this thread's `git cat-file --batch` process"""
+        # One long-running cat-file process serves every read instead of a `git show` per file
+        cat_file = self._get_cat_file()
+        cat_file.stdin.write(f'{branch}:{file_path}\n'.encode('utf-8'))
+        cat_file.stdin.flush()
+        
+        # Header is "<sha> <type> <size>", or "<object> missing" for unknown paths
+        header = cat_file.stdout.readline().decode('utf-8').split()
+        if len(header) != 3 or header[-1] == 'missing':
+            return None, None
+        
+        sha, object_type, size = header
+        content = cat_file.stdout.read(int(size) + 1)[:-1]  # Payload is followed by a newline
+        
+        if object_type != 'blob':
+            return None, None
+        
+        return sha, content
+    
+    def _parse_trees(self, sha: str, content: str) -> Dict[str, BTNode]:
+        """Parse BT file content into {tree_id: BTNode}, reusing the result for a blob seen before"""
+        trees = self._parsed_tree_cache.get(sha)
+        if trees is not None:
+            return trees
+        
+        # A fresh parser per blob keeps cached results independent of each other
+        trees = BTTreeParser().parse_string(content)
+        self._parsed_tree_cache[sha] = trees
+        return trees
     
     def analyze_all_changes_with_trees(self, source_branch: str, target_branch: str, 
-                                     output_file: str = None) -> str:
+                                     output_file: str = None, compress: bool = False) -> str:
         """Analyze all BehaviorTree changes between branches with interactive tree visualization"""
         
         if not self._is_git_repo():
             raise ValueError("Not a git repository")
         
+        # Lookups keyed by branch name are only valid within one run (branches move)
+        self._blob_cache.clear()
+        self._ls_tree_cache.clear()
+        self._subtrees_by_branch_dir.clear()
+        
         # Get all changed files between branches
         print(f"🔍 Analyzing all BehaviorTree changes between {source_branch} and {target_branch}...")
         print(f"📁 Repository path: {self.repo_path}")
         
         try:
             result = subprocess.run([
-                'git', 'diff', '--name-only', 
+                'git', 'diff', '--name-status', '-z',
                 f'{source_branch}', f'{target_branch}'
             ], cwd=self.repo_path, capture_output=True, text=True)
             
             if result.returncode != 0:
                 raise ValueError(f"Git command failed: {result.stderr}")
             
-            changed_files = [f.strip() for f in result.stdout.split('\n') if f.strip()]
+            changed_files = self._parse_name_status(result.stdout)
             
         except Exception as e:
             raise ValueError(f"Failed to get changed files: {e}")
         
         # Filter for BehaviorTree XML files (including sub_tree directories)
         bt_files = []
-        for file in changed_files:
+        for status, file in changed_files:
             if file.endswith('.xml') and any(path_part in file for path_part in ['behavior_tree', 'bt_', 'tree', 'sub_tree']):
                 print(f"📝 Analyzing {file}...")
                 
-                # Check if both branches have this file and it's a valid BT file
+                # The diff status says which branches have the file, so only those are read
+                if status == 'A':
+                    branches = [target_branch]  # File was added
+                elif status == 'D':
+                    branches = [source_branch]  # File was deleted
+                else:
+                    branches = [source_branch, target_branch]
+                
                 try:
-                    source_content = self.get_file_at_branch(file, source_branch)
-                    target_content = self.get_file_at_branch(file, target_branch)
-                    
-                    if source_content and target_content:
-                        # Quick check if it's a BehaviorTree XML
-                        if '<root BTCPP_format=' in source_content or '<root BTCPP_format=' in target_content:
-                            bt_files.append(file)
-                        elif 'BehaviorTree' in source_content or 'BehaviorTree' in target_content:
-                            bt_files.append(file)
-                        elif 'SubTree' in source_content or 'SubTree' in target_content:
-                            bt_files.append(file)
-                    elif source_content and not target_content:
-                        # File was deleted - check if it was a BT file
-                        if ('<root BTCPP_format=' in source_content or 'BehaviorTree' in source_content or 
-                            'SubTree' in source_content):
-                            bt_files.append(file)
-                    elif not source_content and target_content:
-                        # File was added - check if it's a BT file
-                        if ('<root BTCPP_format=' in target_content or 'BehaviorTree' in target_content or 
-                            'SubTree' in target_content):
-                            bt_files.append(file)
-                            
+                    # Quick check if it's a BehaviorTree XML
+                    if any(self._looks_like_bt_file(self._read_blob(file, branch)) for branch in branches):
+                        bt_files.append(file)
                 except Exception as e:
                     print(f"⚠️  Error analyzing {file}: {e}")
                     continue
         
         if not bt_files:
             print("✅ No BehaviorTree files with changes found.")
-            return self._generate_empty_report(source_branch, target_branch, output_file)
+            return self._generate_empty_report(source_branch, target_branch, output_file, compress)
         
         print(f"\n📊 Found {len(bt_files)} BehaviorTree files with changes:")
         for file in bt_files:
             print(f"   • {file}")
         
+        # Diff all BehaviorTree files in one git call
+        try:
+            file_diffs = self._get_file_diffs(source_branch, target_branch, bt_files)
+        except Exception as e:
+            print(f"⚠️  Batched git diff failed, diffing files one by one: {e}")
+            file_diffs = {}
+        
         # Analyze each file and create visualizations
         file_analyses = []
         all_git_changes = []  # Collect all changes for tree visualization
         
-        for file in bt_files:
-            try:
-                analysis = self._analyze_single_file(file, source_branch, target_branch)
+        # Files are analyzed on worker threads; each analysis carries its log lines, which are
+        # printed in file order so the output reads the same as a sequential run
+        with ThreadPoolExecutor(max_workers=min(len(bt_files), os.cpu_count() or 4)) as executor:
+            futures = [
+                executor.submit(self._analyze_single_file, file,
+                                source_branch, target_branch, file_diffs.get(file))
+                for file in bt_files
+            ]
+            for future in futures:
+                analysis = future.result()
                 if analysis:
+                    for line in analysis.log:
+                        print(line)
                     file_analyses.append(analysis)
                     # Collect git changes for tree visualization
-                    if 'changes' in analysis:
-                        all_git_changes.extend(analysis['changes'])
-            except Exception as e:
-                print(f"⚠️  Error analyzing {file}: {e}")
-                file_analyses.append({
-                    'file_path': file,
-                    'error': str(e),
-                    'has_structural_changes': False
-                })
+                    all_git_changes.extend(analysis.changes)
         
         # Store git changes for tree visualization
         self.git_changes = all_git_changes
@@ -214,22 +475,21 @@ class EnhancedBranchBTAnalyzer:
         for change in all_git_changes:
             print(f"  - {change.get('type', 'Unknown')}: {change.get('description', 'No description')}")
         
-        # Generate comprehensive HTML report
-        html_report = self._generate_comprehensive_html_report(
-            source_branch, target_branch, file_analyses
-        )
-        
-        # Write to file
         if output_file is None:
             output_file = f"enhanced_branch_analysis_{source_branch}_vs_{target_branch}.html"
         
         # Ensure output file path is absolute
-        output_path = Path(output_file).resolve()
-        output_path.write_text(html_report, encoding='utf-8')
+        output_path = self._resolve_output_path(output_file, compress)
+        
+        # Write the comprehensive HTML report piece by piece as it is generated; a background
+        # thread does the writing (and compressing) while the next pieces are built
+        with self._open_output(output_path, compress) as out, _BackgroundWriter(out) as writer:
+            self._write_comprehensive_html_report(writer, source_branch, target_branch, file_analyses)
+        self._blob_cache.clear()
         
         # Print summary
         structural_changes = sum(1 for analysis in file_analyses 
-                               if analysis.get('has_structural_changes', False))
+                               if analysis.has_structural_changes)
         
         print(f"\n📈 Analysis Summary:")
         print(f"   • Total changed files: {len(file_analyses)}")
@@ -238,107 +498,159 @@ class EnhancedBranchBTAnalyzer:
         
         return str(output_path)
     
-    def _analyze_single_file(self, file_path: str, source_branch: str, target_branch: str) -> Optional[Dict]:
-        """Analyze a single BehaviorTree file using Git diff approach"""
+    def _parse_name_status(self, output: str) -> List[Tuple[str, str]]:
+        """Parse `git diff --name-status -z` output into (status, path) pairs"""
+        fields = output.split('\0')
+        changed_files = []
+        i = 0
+        while i < len(fields) - 1:
+            status = fields[i]
+            if status[:1] in ('R', 'C'):
+                # Renames and copies list the old path first; only the new path exists in the target
+                changed_files.append(('A', fields[i + 2]))
+                i += 3
+            else:
+                changed_files.append((status[:1], fields[i + 1]))
+                i += 2
+        return changed_files
+    
+    def _looks_like_bt_file(self, content: Optional[bytes]) -> bool:
+        """Check raw file content for BehaviorTree elements, stopping at the first one found"""
+        if not content:
+            return False
         
-        # Get Git diff for this specific file
         try:
-            result = subprocess.run([
-                'git', 'diff', source_branch, target_branch, '--', file_path
-            ], cwd=self.repo_path, capture_output=True, text=True)
+            # Only opening tags are needed, so the document is read just up to the first hit
+            for _, element in ET.iterparse(io.BytesIO(content), events=('start',)):
+                if element.tag in ('BehaviorTree', 'SubTree'):
+                    return True
+                if element.tag == 'root' and 'BTCPP_format' in element.attrib:
+                    return True
+            return False
+        except ET.ParseError:
+            # Broken XML still counts if it carries BT markers, so its error gets reported
+            return b'<root BTCPP_format=' in content or b'BehaviorTree' in content or b'SubTree' in content
+    
+    def _get_file_diffs(self, source_branch: str, target_branch: str,
+                        file_paths: List[str]) -> Dict[str, Tuple[List[Dict], List[Dict]]]:
+        """Diff all given files in a single git call, parsing each file's section as it streams in"""
+        file_diffs = {}
+        section = 0
+        
+        def section_key(line: str) -> int:
+            # Every "diff --git" header starts a new group, so each group is one file's section
+            nonlocal section
+            if line.startswith('diff --git '):
+                section += 1
+            return section
+        
+        # stderr goes to a temporary file: a second pipe left unread while stdout streams could
+        # fill up and stall git
+        with tempfile.TemporaryFile() as stderr_file:
+            with subprocess.Popen([
+                'git', '-c', 'core.quotePath=false', 'diff', '--no-renames',
+                source_branch, target_branch, '--', *file_paths
+            ], cwd=self.repo_path, stdout=subprocess.PIPE, stderr=stderr_file, text=True) as proc:
+                for _, lines in groupby(proc.stdout, key=section_key):
+                    path = _diff_header_path(next(lines))
+                    if path is not None:
+                        file_diffs[path] = self._parse_diff_once(lines)
             
-            if result.returncode != 0:
-                return {
-                    'file_path': file_path,
-                    'error': f"Git diff failed: {result.stderr}",
-                    'has_structural_changes': False
-                }
+            if proc.returncode != 0:
+                raise ValueError(f"Git diff failed: {_read_stderr(stderr_file)}")
+        
+        return file_diffs
+    
+    def _analyze_single_file(self, file_path: str, source_branch: str, target_branch: str,
+                             parsed_diff: Optional[Tuple[List[Dict], List[Dict]]] = None) -> Optional[FileAnalysis]:
+        """Analyze a single BehaviorTree file using Git diff approach"""
+        # Runs on worker threads, so output is collected on the analysis instead of printed
+        log = []
+        try:
+            if parsed_diff is None:
+                # Stream the Git diff for this specific file (not covered by the batched diff)
+                with tempfile.TemporaryFile() as stderr_file:
+                    with subprocess.Popen([
+                        'git', 'diff', source_branch, target_branch, '--', file_path
+                    ], cwd=self.repo_path, stdout=subprocess.PIPE, stderr=stderr_file, text=True) as proc:
+                        first_line = proc.stdout.readline()
+                        if first_line:
+                            parsed_diff = self._parse_diff_once(chain([first_line], proc.stdout))
+                    
+                    if proc.returncode != 0:
+                        return FileAnalysis(file_path, error=f"Git diff failed: {_read_stderr(stderr_file)}", log=log)
             
-            diff_output = result.stdout
-            if not diff_output.strip():
-                return {
-                    'file_path': file_path,
-                    'change_type': 'NO_CHANGE',
-                    'has_structural_changes': False,
-                    'changes': []
-                }
+            if parsed_diff is None:
+                return FileAnalysis(file_path, change_type='NO_CHANGE', log=log)
             
-            # Parse diff output to extract actual changes
-            changes = self._parse_git_diff(diff_output)
-            subtree_changes = self._analyze_subtree_references_from_diff(diff_output)
+            changes, subtree_changes = parsed_diff
+            log.append(f"🔍 Git diff found {len(changes)} structural changes")
             
             # Generate tree visualization data if there are changes
             tree_data = None
             if len(changes) > 0 or len(subtree_changes) > 0:
-                tree_data = self._generate_tree_with_git_changes(file_path, source_branch, target_branch, changes)
+                tree_data = self._generate_tree_with_git_changes(file_path, source_branch, target_branch, changes, log)
             
-            return {
-                'file_path': file_path,
-                'change_type': 'MODIFIED',
-                'has_structural_changes': len(changes) > 0 or len(subtree_changes) > 0,
-                'changes': changes,
-                'subtree_changes': subtree_changes,
-                'tree_data': tree_data
-            }
+            return FileAnalysis(
+                file_path=file_path,
+                change_type='MODIFIED',
+                has_structural_changes=len(changes) > 0 or len(subtree_changes) > 0,
+                changes=changes,
+                subtree_changes=subtree_changes,
+                tree_data=tree_data,
+                log=log
+            )
             
         except Exception as e:
-            return {
-                'file_path': file_path,
-                'error': f"Analysis failed: {e}",
-                'has_structural_changes': False
-            }
+            return FileAnalysis(file_path, error=f"Analysis failed: {e}", log=log)
     
-    def _parse_git_diff(self, diff_output: str) -> List[Dict]:
-        """Parse Git diff output to extract BehaviorTree node changes"""
+    def _parse_diff_once(self, diff_lines: Iterable[str]) -> Tuple[List[Dict], List[Dict]]:
+        """Parse Git diff lines into BehaviorTree node changes and SubTree reference changes in one pass"""
         changes = []
-        lines = diff_output.split('\n')
-        
-        bt_tags = [
-            'Action', 'Condition', 'Sequence', 'Fallback', 'Parallel', 
-            'ForceSuccess', 'ForceFailure', 'Inverter', 'Retry', 'Timeout',
-            'SubTree', 'Decorator', 'Control', 'SetBlackboard', 'AlwaysSuccess', 
-            'AlwaysFailure', 'IfThenElse', 'RetryUntilSuccessful'
-        ]
+        subtree_changes = []
         
-        for line in lines:
-            if line.startswith('-') and not line.startswith('---'):
-                # Removed line
-                clean_line = line[1:].strip()
-                if any(f'<{tag}' in clean_line for tag in bt_tags):
-                    node_info = self._extract_node_info_from_line(clean_line)
-                    # Only count main behavior nodes, not wrapper/decorator nodes without meaningful content
-                    if self._is_meaningful_change(node_info, clean_line):
-                        changes.append({
-                            'type': 'REMOVED',
-                            'description': f"Removed {node_info['tag']}" + 
-                                         (f" (ID: {node_info['id']})" if node_info['id'] else "") +
-                                         (f" with detector_name='{node_info['attributes'].get('detector_name', '')}'" if 'detector_name' in node_info['attributes'] else ""),
-                            'full_line': clean_line,
-                            'node_tag': node_info['tag'],
-                            'node_id': node_info['id'],
-                            'attributes': node_info.get('attributes', {})
-                        })
+        for line in diff_lines:
+            # One character decides; the rare ---/+++ file headers need the second check
+            marker = line[:1]
+            if marker == '-':
+                if line.startswith('---'):
+                    continue
+                change_type = 'REMOVED'  # Removed line
+            elif marker == '+':
+                if line.startswith('+++'):
+                    continue
+                change_type = 'ADDED'  # Added line
+            else:
+                continue
             
-            elif line.startswith('+') and not line.startswith('+++'):
-                # Added line
-                clean_line = line[1:].strip()
-                if any(f'<{tag}' in clean_line for tag in bt_tags):
-                    node_info = self._extract_node_info_from_line(clean_line)
-                    # Only count main behavior nodes, not wrapper/decorator nodes without meaningful content
-                    if self._is_meaningful_change(node_info, clean_line):
-                        changes.append({
-                            'type': 'ADDED',
-                            'description': f"Added {node_info['tag']}" + 
-                                         (f" (ID: {node_info['id']})" if node_info['id'] else "") +
-                                         (f" with detector_name='{node_info['attributes'].get('detector_name', '')}'" if 'detector_name' in node_info['attributes'] else ""),
-                            'full_line': clean_line,
-                            'node_tag': node_info['tag'],
-                            'node_id': node_info['id'],
-                            'attributes': node_info.get('attributes', {})
-                        })
+            clean_line = line[1:].strip()
+            tag_match = _BT_TAG_RE.search(clean_line)
+            if tag_match:
+                node_info = self._extract_node_info_from_line(clean_line, tag_match.group(1))
+                # Only count main behavior nodes, not wrapper/decorator nodes without meaningful content
+                if self._is_meaningful_change(node_info, clean_line):
+                    changes.append({
+                        'type': change_type,
+                        'description': f"{change_type.capitalize()} {node_info['tag']}" + 
+                                     (f" (ID: {node_info['id']})" if node_info['id'] else "") +
+                                     (f" with detector_name='{node_info['attributes'].get('detector_name', '')}'" if 'detector_name' in node_info['attributes'] else ""),
+                        'full_line': clean_line,
+                        'node_tag': node_info['tag'],
+                        'node_id': node_info['id'],
+                        'attributes': node_info.get('attributes', {})
+                    })
+            
+            if 'SubTree' in line:
+                # SubTree reference added or removed
+                id_match = _ID_RE.search(line)
+                tree_id = id_match.group(1) if id_match else 'Unknown'
+                subtree_changes.append({
+                    'type': f'SUBTREE_{change_type}',
+                    'tree_id': tree_id,
+                    'description': f"SubTree '{tree_id}' was {change_type.lower()}"
+                })
         
-        print(f"🔍 Git diff found {len(changes)} structural changes")
-        return changes
+        return changes, subtree_changes
     
     def _is_meaningful_change(self, node_info: Dict, line: str) -> bool:
         """Determine if a node change is meaningful (not just a wrapper)"""
@@ -347,15 +659,15 @@ class EnhancedBranchBTAnalyzer:
         attributes = node_info.get('attributes', {})
         
         # Primary behavior nodes - always meaningful
-        if tag in ['Action', 'Condition', 'SubTree']:
+        if tag in _PRIMARY_TAGS:
             return True
         
         # Control flow nodes with IDs or significant attributes - meaningful
-        if tag in ['Sequence', 'Fallback', 'Parallel'] and (node_id or len(attributes) > 0):
+        if tag in _CONTROL_TAGS and (node_id or len(attributes) > 0):
             return True
         
         # Decorator nodes - only meaningful if they have IDs or are self-closing with attributes
-        if tag in ['ForceSuccess', 'ForceFailure', 'Inverter', 'Retry', 'Timeout']:
+        if tag in _DECORATOR_TAGS:
             # Self-closing tags (end with '/>' or have meaningful attributes) are more likely to be meaningful
             if '/>' in line or node_id or len(attributes) > 0:
                 return True
@@ -365,197 +677,162 @@ class EnhancedBranchBTAnalyzer:
         # Other nodes - check for meaningful content
         return bool(node_id or len(attributes) > 1)
     
-    def _extract_node_info_from_line(self, line: str) -> Dict:
-        """Extract node information from XML line"""
-        import re
-        
+    def _extract_node_info_from_line(self, line: str, tag: Optional[str] = None) -> Dict:
+        """Extract node information from XML line (the tag may already be known from the prefilter)"""
         # Extract tag name
-        tag_match = re.search(r'<(\w+)', line)
-        tag = tag_match.group(1) if tag_match else 'Unknown'
+        if tag is None:
+            tag_match = _TAG_RE.search(line)
+            tag = tag_match.group(1) if tag_match else 'Unknown'
         
-        # Extract ID attribute
-        id_match = re.search(r'ID="([^"]*)"', line)
-        node_id = id_match.group(1) if id_match else ''
-        
-        # Extract all attributes
-        attributes = {}
-        attr_pattern = r'(\w+)="([^"]*)"'
-        for match in re.finditer(attr_pattern, line):
-            attr_name, attr_value = match.groups()
-            attributes[attr_name] = attr_value
+        # Extract all attributes in one pass; the ID is just one of them
+        attributes = dict(_ATTR_RE.findall(line))
         
         return {
             'tag': tag, 
-            'id': node_id,
+            'id': attributes.get('ID', ''),
             'attributes': attributes
         }
     
-    def _analyze_subtree_references_from_diff(self, diff_output: str) -> List[Dict]:
-        """Analyze SubTree reference changes from Git diff"""
-        subtree_changes = []
-        lines = diff_output.split('\n')
-        
-        for line in lines:
-            if 'SubTree' in line:
-                if line.startswith('-') and not line.startswith('---'):
-                    # SubTree removed
-                    id_match = re.search(r'ID="([^"]*)"', line)
-                    tree_id = id_match.group(1) if id_match else 'Unknown'
-                    subtree_changes.append({
-                        'type': 'SUBTREE_REMOVED',
-                        'tree_id': tree_id,
-                        'description': f"SubTree '{tree_id}' was removed"
-                    })
-                elif line.startswith('+') and not line.startswith('+++'):
-                    # SubTree added
-                    id_match = re.search(r'ID="([^"]*)"', line)
-                    tree_id = id_match.group(1) if id_match else 'Unknown'
-                    subtree_changes.append({
-                        'type': 'SUBTREE_ADDED',
-                        'tree_id': tree_id,
-                        'description': f"SubTree '{tree_id}' was added"
-                    })
-        
-        return subtree_changes
-    
-    def _generate_tree_with_git_changes(self, file_path: str, source_branch: str, target_branch: str, changes: List[Dict]) -> Optional[Dict]:
+    def _generate_tree_with_git_changes(self, file_path: str, source_branch: str, target_branch: str, changes: List[Dict],
+                                        log: List[str]) -> Optional[Dict]:
         """Generate tree visualization data with Git-based changes"""
         try:
             # Get both versions of the file
-            source_content = self.get_file_at_branch(file_path, source_branch)
-            target_content = self.get_file_at_branch(file_path, target_branch)
+            source_sha, source_content = self._get_file_with_sha(file_path, source_branch)
+            target_sha, target_content = self._get_file_with_sha(file_path, target_branch)
             
             if not target_content:
                 return None
             
-            # Create temporary files and parse both versions
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as tmp1:
-                if source_content:
-                    tmp1.write(source_content)
-                else:
-                    tmp1.write('<root></root>')  # Empty tree for new files
-                source_tmp = tmp1.name
+            # Parse both files (unchanged blobs are parsed only once)
+            source_trees = self._parse_trees(source_sha, source_content) if source_content else {}
+            target_trees = self._parse_trees(target_sha, target_content)
+            if source_content:
+                # Both versions used to go through one parser, so target definitions
+                # shadow source ones with the same ID
+                source_trees = ChainMap(target_trees, source_trees)
             
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as tmp2:
-                tmp2.write(target_content)
-                target_tmp = tmp2.name
+            # Load SubTree definitions
+            main_file_path = self.repo_path / file_path
+            source_subtrees = self._load_subtrees(main_file_path, source_branch, log) if source_content else {}
+            target_subtrees = self._load_subtrees(main_file_path, target_branch, log)
+            
+            # Overlay subtrees on the main trees without copying either (the dicts may be cached)
+            all_source_trees = ChainMap(source_subtrees, source_trees)
+            all_target_trees = ChainMap(target_subtrees, target_trees)
+            
+            # Get trees with actual changes
+            log.append(f"🔍 Finding tree with changes from {len(all_source_trees)} source trees and {len(all_target_trees)} target trees")
+            log.append(f"🔍 Available target trees: {list(all_target_trees.keys())}")
+            
+            target_tree_id = self._find_tree_with_changes(all_source_trees, all_target_trees, changes, log)
+            source_tree_id = target_tree_id  # Use same tree for comparison
+            
+            log.append(f"🔍 Selected tree for visualization: {target_tree_id}")
+            
+            # Convert to D3 format with changes - Both trees should expand SubTrees
+            visualizer = EnhancedTreeVisualizer()
+            source_d3 = visualizer._tree_to_d3_format_with_subtrees(
+                all_source_trees.get(source_tree_id, {'type': 'Empty', 'children': []}), changes, 'old', all_source_trees, log
+            ) if all_source_trees else {'name': 'Empty', 'children': []}
+            
+            target_d3 = visualizer._tree_to_d3_format_with_subtrees(
+                all_target_trees[target_tree_id], changes, 'new', all_target_trees, log
+            )
+            
+            return {
+                'source_tree': source_d3,
+                'target_tree': target_d3,
+                'source_tree_id': source_tree_id,
+                'target_tree_id': target_tree_id
+            }
             
-            try:
-                parser = BTTreeParser()
-                
-                # Parse both files
-                source_trees = parser.parse_file(source_tmp) if source_content else {}
-                target_trees = parser.parse_file(target_tmp)
-                
-                # Load SubTree definitions
-                source_subtrees = self._load_subtrees(source_tmp, source_branch) if source_content else {}
-                target_subtrees = self._load_subtrees(target_tmp, target_branch)
-                
-                # Merge subtrees into main trees
-                all_source_trees = {**source_trees, **source_subtrees}
-                all_target_trees = {**target_trees, **target_subtrees}
-                
-                # Get trees with actual changes
-                print(f"🔍 Finding tree with changes from {len(all_source_trees)} source trees and {len(all_target_trees)} target trees")
-                print(f"🔍 Available target trees: {list(all_target_trees.keys())}")
-                
-                target_tree_id = self._find_tree_with_changes(all_source_trees, all_target_trees, changes)
-                source_tree_id = target_tree_id  # Use same tree for comparison
-                
-                print(f"🔍 Selected tree for visualization: {target_tree_id}")
-                
-                # Convert to D3 format with changes - Both trees should expand SubTrees
-                visualizer = EnhancedTreeVisualizer()
-                source_d3 = visualizer._tree_to_d3_format_with_subtrees(
-                    all_source_trees.get(source_tree_id, {'type': 'Empty', 'children': []}), changes, 'old', all_source_trees
-                ) if all_source_trees else {'name': 'Empty', 'children': []}
-                
-                target_d3 = visualizer._tree_to_d3_format_with_subtrees(
-                    all_target_trees[target_tree_id], changes, 'new', all_target_trees
-                )
-                
-                return {
-                    'source_tree': source_d3,
-                    'target_tree': target_d3,
-                    'source_tree_id': source_tree_id,
-                    'target_tree_id': target_tree_id
-                }
-                
-            finally:
-                Path(source_tmp).unlink()
-                Path(target_tmp).unlink()
-                
         except Exception as e:
-            print(f"❌ Error generating tree data: {e}")
+            log.append(f"❌ Error generating tree data: {e}")
             return None
     
-    def _load_subtrees(self, main_file_path: str, branch: str) -> Dict:
+    def _load_subtrees(self, main_file_path: str, branch: str, log: List[str]) -> Dict:
         """Load SubTree definitions from separate files"""
+        # BT files in the same directory share their SubTrees, so each set is loaded once per branch
+        main_dir = Path(main_file_path).parent
+        key = (branch, main_dir)
+        subtrees = self._subtrees_by_branch_dir.get(key)
+        if subtrees is not None:
+            return subtrees
+        
         subtrees = {}
         
         try:
-            # Get the directory of the main file
-            main_dir = Path(main_file_path).parent
-            
-            # Look for sub_tree directory relative to main file
-            subtree_dirs = [
-                main_dir / 'sub_tree',
-                main_dir.parent / 'sub_tree',
-                main_dir.parent.parent / 'sub_tree'
-            ]
-            
-            parser = BTTreeParser()
-            
-            for subtree_dir in subtree_dirs:
-                if subtree_dir.exists():
-                    # Find all XML files in sub_tree directories
-                    xml_files = list(subtree_dir.rglob('*.xml'))
-                    
-                    for xml_file in xml_files:
-                        try:
-                            # Get file content from Git
-                            relative_path = str(xml_file.relative_to(Path(self.repo_path)))
-                            content = self.get_file_at_branch(relative_path, branch)
-                            
-                            if content:
-                                # Create temporary file and parse
-                                with tempfile.NamedTemporaryFile(mode='w', suffix='.xml', delete=False) as tmp:
-                                    tmp.write(content)
-                                    tmp_path = tmp.name
-                                
-                                try:
-                                    file_trees = parser.parse_file(tmp_path)
-                                    subtrees.update(file_trees)
-                                finally:
-                                    Path(tmp_path).unlink()
-                                    
-                        except Exception as e:
-                            print(f"Warning: Failed to load SubTree {xml_file}: {e}")
+            for relative_path in self._get_subtree_files(main_dir, branch):
+                try:
+                    # Get file content from Git
+                    sha, content = self._get_file_with_sha(relative_path, branch)
                     
-                    break  # Stop after finding first valid subtree directory
+                    if content:
+                        # Subtree files unchanged between branches hit the cache
+                        subtrees.update(self._parse_trees(sha, content))
+                        
+                except Exception as e:
+                    log.append(f"Warning: Failed to load SubTree {relative_path}: {e}")
             
+            self._subtrees_by_branch_dir[key] = subtrees
             return subtrees
             
         except Exception as e:
-            print(f"Warning: Failed to load SubTrees: {e}")
+            log.append(f"Warning: Failed to load SubTrees: {e}")
             return {}
     
+    def _get_subtree_files(self, main_dir: Path, branch: str) -> List[str]:
+        """List the repo-relative SubTree XML files for a main file directory at a branch"""
+        subtree_files = []
+        
+        # Look for sub_tree directory relative to main file
+        subtree_dirs = [
+            main_dir / 'sub_tree',
+            main_dir.parent / 'sub_tree',
+            main_dir.parent.parent / 'sub_tree'
+        ]
+        
+        for subtree_dir in subtree_dirs:
+            try:
+                prefix = subtree_dir.relative_to(self.repo_path).as_posix()
+            except ValueError:
+                continue  # Outside the repository
+            
+            # Ask git what the directory holds at the branch, not what the working tree has
+            branch_files = self._list_branch_files(branch, prefix)
+            if branch_files:
+                subtree_files = [path for path in branch_files if path.endswith('.xml')]
+                break  # Stop after finding first valid subtree directory
+        
+        return subtree_files
+    
+    def _list_branch_files(self, branch: str, prefix: str) -> List[str]:
+        """List the files under a directory at a branch with one `git ls-tree` call"""
+        key = (branch, prefix)
+        files = self._ls_tree_cache.get(key)
+        if files is not None:
+            return files
+        
+        result = subprocess.run([
+            'git', 'ls-tree', '-r', '-z', '--name-only', branch, '--', f'{prefix}/'
+        ], cwd=self.repo_path, capture_output=True, text=True)
+        
+        files = [path for path in result.stdout.split('\0') if path] if result.returncode == 0 else []
+        self._ls_tree_cache[key] = files
+        return files
+    
     def _analyze_subtree_references(self, source_content: str, target_content: str) -> List[Dict]:
         """Analyze SubTree reference changes between two file contents"""
         subtree_changes = []
         
         try:
             # Extract SubTree references from both versions
-            import re
-            
-            # Find all SubTree node references
-            subtree_pattern = r'<SubTree\s+ID="([^"]+)"[^>]*(?:\s+_description="([^"]*)")?[^>]*/?>'
-            
             source_subtrees = {}
             target_subtrees = {}
             
             # Parse source subtrees
-            for match in re.finditer(subtree_pattern, source_content, re.IGNORECASE):
+            for match in _SUBTREE_RE.finditer(source_content):
                 tree_id = match.group(1)
                 description = match.group(2) if match.group(2) else ""
                 source_subtrees[tree_id] = {
@@ -565,7 +842,7 @@ class EnhancedBranchBTAnalyzer:
                 }
             
             # Parse target subtrees  
-            for match in re.finditer(subtree_pattern, target_content, re.IGNORECASE):
+            for match in _SUBTREE_RE.finditer(target_content):
                 tree_id = match.group(1)
                 description = match.group(2) if match.group(2) else ""
                 target_subtrees[tree_id] = {
@@ -645,14 +922,25 @@ class EnhancedBranchBTAnalyzer:
     
     def _change_to_dict(self, change) -> Dict:
         """Convert change object to dictionary"""
+        # Normalize the change type once; enum members carry their string in .value
+        change_type = change.change_type
+        try:
+            change_type_str = change_type.value
+        except AttributeError:
+            change_type_str = str(change_type)
+        
         # Skip UNCHANGED changes - we don't need to show them
-        if (hasattr(change, 'change_type') and 
-            (change.change_type.value if hasattr(change.change_type, 'value') else str(change.change_type)) == 'unchanged'):
+        if change_type_str == 'unchanged':
             return None
-            
+        
+        try:
+            description = change.description
+        except AttributeError:
+            description = str(change_type)
+        
         result = {
-            'type': change.change_type.value if hasattr(change.change_type, 'value') else str(change.change_type),
-            'description': getattr(change, 'description', str(change.change_type))
+            'type': change_type_str,
+            'description': description
         }
         
         if hasattr(change, 'old_path'):
@@ -662,16 +950,305 @@ class EnhancedBranchBTAnalyzer:
             
         return result
     
-    def _generate_empty_report(self, source_branch: str, target_branch: str, output_file: str) -> str:
+    def _resolve_output_path(self, output_file: str, compress: bool = False) -> Path:
+        """Return the output file as an absolute path, with .gz appended for compressed reports"""
+        path = Path(output_file)
+        if compress and path.suffix != '.gz':
+            path = path.with_name(path.name + '.gz')
+        # resolve() stats every path component; an absolute path that is not a symlink
+        # can be written as is
+        if path.is_absolute() and not path.is_symlink():
+            return path
+        return path.resolve()
+    
+    def _open_output(self, output_path: Path, compress: bool = False) -> TextIO:
+        """Open a report file for writing, gzip-compressed when requested"""
+        if compress:
+            return gzip.open(output_path, 'wt', encoding='utf-8', compresslevel=6)
+        return open(output_path, 'w', encoding='utf-8', buffering=1 << 20)
+    
+    def _generate_empty_report(self, source_branch: str, target_branch: str, output_file: str,
+                               compress: bool = False) -> str:
         """Generate empty report when no changes found"""
-        html_content = f"""
+        html_content = _fill_template(_EMPTY_REPORT_TEMPLATE_PARTS, {
+            'source_branch': html.escape(source_branch),
+            'target_branch': html.escape(target_branch)
+        })
+        
+        if output_file is None:
+            output_file = f"no_changes_{source_branch}_vs_{target_branch}.html"
+            
+        output_path = self._resolve_output_path(output_file, compress)
+        if compress:
+            with self._open_output(output_path, compress) as out:
+                out.write(html_content)
+        else:
+            # The page is already in memory, so it is encoded once and written straight to the fd
+            _write_file_bytes(output_path, html_content.encode('utf-8'))
+        return str(output_path)
+    
+    def _write_comprehensive_html_report(self, out: TextIO, source_branch: str, target_branch: str,
+                                         file_analyses: List[FileAnalysis]):
+        """Write comprehensive HTML report with interactive tree visualizations to a stream"""
+        
+        # Calculate summary statistics
+        total_files = len(file_analyses)
+        files_with_changes = sum(1 for analysis in file_analyses 
+                               if analysis.has_structural_changes)
+        
+        # Files with trees to render, noted while their sections are generated so that
+        # file_analyses is walked only once (the sections come before the tree data in the page)
+        tree_files = []
+        
+        def file_sections():
+            """Generate file sections one at a time"""
+            for i, analysis in enumerate(file_analyses):
+                if analysis.tree_data:
+                    tree_files.append((i, analysis.tree_data))
+                
+                if analysis.error:
+                    yield _error_section(analysis.file_path, analysis.error)
+                elif analysis.has_structural_changes:
+                    yield self._generate_file_section(analysis, i)
+                else:
+                    yield _no_change_section(analysis.file_path)
+        
+        def tree_data():
+            """Generate the JSON blob holding every file's trees, one file at a time"""
+            # Branch names travel in the blob too, so the page script has no values spliced in
+            yield (f'{{"source_branch":{_json_dumps(source_branch)},'
+                   f'"target_branch":{_json_dumps(target_branch)},"trees":[')
+            for j, (i, data) in enumerate(tree_files):
+                # Subtrees the branches have in common are written once and referenced by index
+                shared, source_tree, target_tree = _share_subtrees(data['source_tree'], data['target_tree'])
+                yield (f'{"," if j else ""}{{"index":{i},"shared":{_json_dumps(shared)},'
+                       f'"source":{_json_dumps(source_tree)},'
+                       f'"target":{_json_dumps(target_tree)}}}')
+            yield ']}'
+        
+        # Sections and tree data are written as they are built, so the whole page never sits in memory
+        _write_template(out, _REPORT_TEMPLATE_PARTS, {
+            'source_branch': html.escape(source_branch),
+            'target_branch': html.escape(target_branch),
+            'total_files': str(total_files),
+            'files_with_changes': str(files_with_changes),
+            'unchanged_files': str(total_files - files_with_changes),
+            'file_sections': file_sections(),
+            'tree_data': tree_data()
+        })
+    
+    def _generate_file_section(self, analysis: FileAnalysis, index: int) -> str:
+        """Generate HTML section for a file with changes"""
+        
+        # Paths, descriptions and tree IDs come from the repository, so they are escaped for HTML
+        file_path = html.escape(analysis.file_path)
+        changes = analysis.changes
+        subtree_changes = analysis.subtree_changes
+        tree_data = analysis.tree_data
+        change_type = analysis.change_type
+        
+        # Generate changes summary
+        changes_html = ""
+        if changes or subtree_changes:
+            # Regular changes, then SubTree changes
+            change_items = [
+                f'<div class="change-item {_CHANGE_CLASS.get(change["type"]) or "change-" + change["type"].lower()}">'
+                f'{html.escape(change["description"])}</div>'
+                for change in changes
+            ]
+            change_items += [
+                f'<div class="change-item {_SUBTREE_CHANGE_CLASS.get(change["type"], "change-subtree")}">'
+                f'🌲 {html.escape(change["description"])}</div>'
+                for change in subtree_changes
+            ]
+            
+            changes_html = f'<div class="changes-summary">{"".join(change_items)}</div>'
+        
+        # Generate tree visualization HTML
+        tree_html = ""
+        if tree_data:
+            tree_html = f"""
+            <div class="tree-container">
+                <div class="tree-panel">
+                    <div class="tree-title">🔴 Before ({html.escape(tree_data.get('source_tree_id', 'Tree'))})</div>
+                    <div class="tree-svg-container">
+                        <svg id="sourceTree{index}" class="tree-svg"></svg>
+                    </div>
+                </div>
+                <div class="tree-panel">
+                    <div class="tree-title">🟢 After ({html.escape(tree_data.get('target_tree_id', 'Tree'))})</div>
+                    <div class="tree-svg-container">
+                        <svg id="targetTree{index}" class="tree-svg"></svg>
+                    </div>
+                </div>
+            </div>
+            """
+        else:
+            tree_html = '<div class="no-changes">No tree visualization available</div>'
+        
+        badge_class = f"badge-{change_type.lower()}"
+        
+        return f"""
+        <div class="file-section">
+            <div class="file-header">
+                <h3 class="file-path">{file_path} <span class="change-badge {badge_class}">{change_type}</span></h3>
+            </div>
+            {changes_html}
+            {tree_html}
+        </div>
+        """
+
+@lru_cache(maxsize=4096)
+def _no_change_section(file_path: str) -> str:
+    """Generate HTML section for files with no changes"""
+    return f"""
+        <div class="file-section">
+            <div class="file-header">
+                <h3 class="file-path">{html.escape(file_path)} <span class="change-badge badge-unchanged">UNCHANGED</span></h3>
+            </div>
+            <div class="no-changes">No structural changes detected</div>
+        </div>
+        """
+
+@lru_cache(maxsize=4096)
+def _error_section(file_path: str, error: str) -> str:
+    """Generate HTML section for files with errors"""
+    return f"""
+        <div class="file-section">
+            <div class="file-header">
+                <h3 class="file-path">{html.escape(file_path)} <span class="change-badge badge-error">ERROR</span></h3>
+            </div>
+            <div class="error-section">
+                <strong>Analysis Error:</strong> {html.escape(error)}
+            </div>
+        </div>
+        """
+
+def _subtree_digests(node: Optional[Dict], digests: Dict[int, bytes]) -> Optional[bytes]:
+    """Record a content hash for every subtree of a D3 tree, keyed by id() of its dict"""
+    if not isinstance(node, dict):
+        return None
+
+    # Post-order with an explicit stack: a dict is hashed on its second pop, after its children
+    stack = [(node, False)]
+    while stack:
+        current, expanded = stack.pop()
+        children = current.get('children') or ()
+        if not expanded:
+            stack.append((current, True))
+            stack.extend((child, False) for child in children if isinstance(child, dict))
+            continue
+
+        digest = hashlib.blake2b(
+            _json_dumps({k: v for k, v in current.items() if k != 'children'}).encode('utf-8'),
+            digest_size=16
+        )
+        for child in children:
+            digest.update(digests[id(child)] if isinstance(child, dict) else b'')
+        digests[id(current)] = digest.digest()
+    return digests[id(node)]
+
+def _replace_shared(node: Optional[Dict], digests: Dict[int, bytes], common: set,
+                    refs: Dict[bytes, int], shared: List[Dict]) -> Optional[Dict]:
+    """Copy a D3 tree, swapping the largest subtrees found in both trees for {"$ref": n}"""
+    # Replace nodes in place within copied children lists, with a stack of (children list, index)
+    # positions pushed in reverse so shared subtrees are numbered in document order
+    result = [node]
+    stack = [(result, 0)]
+    while stack:
+        siblings, index = stack.pop()
+        current = siblings[index]
+        if not isinstance(current, dict):
+            continue
+
+        digest = digests[id(current)]
+        if digest in common:
+            ref = refs.get(digest)
+            if ref is None:
+                ref = refs[digest] = len(shared)
+                shared.append(current)
+            siblings[index] = {'$ref': ref}
+        elif current.get('children'):
+            copy = dict(current)
+            children = copy['children'] = list(current['children'])
+            siblings[index] = copy
+            stack.extend((children, i) for i in range(len(children) - 1, -1, -1))
+    return result[0]
+
+def _share_subtrees(source: Optional[Dict], target: Optional[Dict]) -> Tuple[List[Dict], Optional[Dict], Optional[Dict]]:
+    """Move subtrees that are identical in the source and target trees into one shared table"""
+    source_digests = {}
+    target_digests = {}
+    _subtree_digests(source, source_digests)
+    _subtree_digests(target, target_digests)
+    common = set(source_digests.values()).intersection(target_digests.values())
+
+    refs = {}
+    shared = []
+    return (shared,
+            _replace_shared(source, source_digests, common, refs, shared),
+            _replace_shared(target, target_digests, common, refs, shared))
+
+def _write_file_bytes(path: Path, data: bytes):
+    """Write bytes to a file through a raw file descriptor, without a buffered text wrapper"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+def _split_template(template: str, fields: List[str]) -> List[str]:
+    """Split a template at its {field} holes: literal text at even indices, field names at odd ones"""
+    return re.split(r'\{(' + '|'.join(fields) + r')\}', template)
+
+def _fill_template(parts: List[str], values: Dict[str, str]) -> str:
+    """Join the parts of a split template with the given field values"""
+    return ''.join(values[part] if i % 2 else part for i, part in enumerate(parts))
+
+def _write_template(out: TextIO, parts: List[str], values: Dict[str, Union[str, Iterable[str]]]):
+    """Write a split template to a stream; iterable values are written item by item, one per line"""
+    for i, part in enumerate(parts):
+        if not i % 2:
+            out.write(part)
+            continue
+        
+        value = values[part]
+        if isinstance(value, str):
+            out.write(value)
+        else:
+            for j, item in enumerate(value):
+                if j:
+                    out.write('\n')
+                out.write(item)
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_SPACE_RE = re.compile(r'\s+')
+_CSS_PUNCT_SPACE_RE = re.compile(r' ?([{};,>]) ?')
+_STYLE_RE = re.compile(r'(<style>)(.*?)(</style>)', re.DOTALL)
+
+def _minify_css(css: str) -> str:
+    """Strip comments and the whitespace that is insignificant in the report stylesheets"""
+    css = _CSS_SPACE_RE.sub(' ', _CSS_COMMENT_RE.sub('', css))
+    css = _CSS_PUNCT_SPACE_RE.sub(r'\1', css).replace(': ', ':')
+    return css.replace(';}', '}').strip()
+
+def _minify_styles(page: str) -> str:
+    """Minify every <style> block of a page template"""
+    return _STYLE_RE.sub(lambda m: m.group(1) + _minify_css(m.group(2)) + m.group(3), page)
+
+# Report pages are plain text rather than str.format() templates, so CSS and JS braces are
+# written as-is; their stylesheets are minified and they are split at their {field} holes
+# once, at import
+_EMPTY_REPORT_TEMPLATE = """
         <!DOCTYPE html>
         <html>
         <head>
             <title>Branch Analysis: {source_branch} vs {target_branch}</title>
             <style>
-                body {{ font-family: Arial, sans-serif; padding: 40px; text-align: center; }}
-                .no-changes {{ color: #4CAF50; font-size: 18px; }}
+                body { font-family: Arial, sans-serif; padding: 40px; text-align: center; }
+                .no-changes { color: #4CAF50; font-size: 18px; }
             </style>
         </head>
         <body>
@@ -684,34 +1261,10 @@ class EnhancedBranchBTAnalyzer:
         </body>
         </html>
         """
-        
-        if output_file is None:
-            output_file = f"no_changes_{source_branch}_vs_{target_branch}.html"
-            
-        output_path = Path(output_file).resolve()
-        output_path.write_text(html_content, encoding='utf-8')
-        return str(output_path)
-    
-    def _generate_comprehensive_html_report(self, source_branch: str, target_branch: str, 
-                                          file_analyses: List[Dict]) -> str:
-        """Generate comprehensive HTML report with interactive tree visualizations"""
-        
-        # Calculate summary statistics
-        total_files = len(file_analyses)
-        files_with_changes = sum(1 for analysis in file_analyses 
-                               if analysis.get('has_structural_changes', False))
-        
-        # Generate file sections
-        file_sections = []
-        for i, analysis in enumerate(file_analyses):
-            if analysis.get('error'):
-                file_sections.append(self._generate_error_section(analysis))
-            elif analysis.get('has_structural_changes'):
-                file_sections.append(self._generate_file_section(analysis, i))
-            else:
-                file_sections.append(self._generate_no_change_section(analysis))
-        
-        html_template = """
+
+_EMPTY_REPORT_TEMPLATE_PARTS = _split_template(_minify_styles(_EMPTY_REPORT_TEMPLATE), ['source_branch', 'target_branch'])
+
+_REPORT_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -720,15 +1273,15 @@ class EnhancedBranchBTAnalyzer:
     <title>🌳 Enhanced Branch BehaviorTree Analysis</title>
     <script src="https://d3js.org/d3.v7.min.js"></script>
     <style>
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             margin: 0;
             padding: 20px;
             background-color: #f5f5f5;
             line-height: 1.6;
-        }}
+        }
         
-        .header {{
+        .header {
             text-align: center;
             margin-bottom: 30px;
             padding: 20px;
@@ -736,138 +1289,138 @@ class EnhancedBranchBTAnalyzer:
             color: white;
             border-radius: 8px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .legend-container {{
+        .legend-container {
             background: white;
             margin: 20px 0;
             padding: 20px;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
+        }
         
-        .legend-title {{
+        .legend-title {
             font-size: 18px;
             font-weight: bold;
             margin-bottom: 15px;
             text-align: center;
-        }}
+        }
         
-        .legend-grid {{
+        .legend-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 15px;
-        }}
+        }
         
-        .legend-section {{
+        .legend-section {
             padding: 10px;
             border-radius: 6px;
             background: #f8f9fa;
-        }}
+        }
         
-        .legend-section h4 {{
+        .legend-section h4 {
             margin: 0 0 10px 0;
             font-size: 14px;
             color: #495057;
-        }}
+        }
         
-        .legend-item {{
+        .legend-item {
             display: flex;
             align-items: center;
             margin: 5px 0;
             font-size: 12px;
-        }}
+        }
         
-        .legend-circle {{
+        .legend-circle {
             width: 16px;
             height: 16px;
             border-radius: 50%;
             margin-right: 8px;
             border: 2px solid;
-        }}
+        }
         
         /* Node type colors */
-        .legend-control {{ background: #e3f2fd; border-color: #2196F3; }}
-        .legend-action {{ background: #e8f5e8; border-color: #4CAF50; }}
-        .legend-condition {{ background: #fff3e0; border-color: #FF9800; }}
-        .legend-decorator {{ background: #f3e5f5; border-color: #9C27B0; }}
-        .legend-subtree {{ background: #efebe9; border-color: #795548; }}
+        .legend-control { background: #e3f2fd; border-color: #2196F3; }
+        .legend-action { background: #e8f5e8; border-color: #4CAF50; }
+        .legend-condition { background: #fff3e0; border-color: #FF9800; }
+        .legend-decorator { background: #f3e5f5; border-color: #9C27B0; }
+        .legend-subtree { background: #efebe9; border-color: #795548; }
         
         /* Change type colors */
-        .legend-added {{ background: #c8e6c9; border-color: #4CAF50; border-width: 3px; }}
-        .legend-removed {{ background: #ffcdd2; border-color: #f44336; border-width: 3px; }}
-        .legend-modified {{ background: #fff3cd; border-color: #ffc107; border-width: 3px; }}
-        .legend-moved {{ background: #bbdefb; border-color: #2196F3; border-width: 3px; }}
+        .legend-added { background: #c8e6c9; border-color: #4CAF50; border-width: 3px; }
+        .legend-removed { background: #ffcdd2; border-color: #f44336; border-width: 3px; }
+        .legend-modified { background: #fff3cd; border-color: #ffc107; border-width: 3px; }
+        .legend-moved { background: #bbdefb; border-color: #2196F3; border-width: 3px; }
         
-        .summary-stats {{
+        .summary-stats {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             margin: 20px 0 40px 0;
-        }}
+        }
         
-        .stat-card {{
+        .stat-card {
             background: white;
             padding: 20px;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
             text-align: center;
-        }}
+        }
         
-        .stat-number {{
+        .stat-number {
             font-size: 2.5em;
             font-weight: bold;
             margin-bottom: 10px;
-        }}
+        }
         
-        .total-files {{ color: #2196F3; }}
-        .changed-files {{ color: #4CAF50; }}
-        .unchanged-files {{ color: #9E9E9E; }}
+        .total-files { color: #2196F3; }
+        .changed-files { color: #4CAF50; }
+        .unchanged-files { color: #9E9E9E; }
         
-        .file-section {{
+        .file-section {
             background: white;
             margin: 20px 0;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
             overflow: hidden;
-        }}
+        }
         
-        .file-header {{
+        .file-header {
             padding: 20px;
             background: #f8f9fa;
             border-bottom: 1px solid #dee2e6;
             display: flex;
             justify-content: space-between;
             align-items: center;
-        }}
+        }
         
-        .file-path {{
+        .file-path {
             font-family: monospace;
             font-size: 16px;
             color: #495057;
             margin: 0;
-        }}
+        }
         
-        .change-badge {{
+        .change-badge {
             display: inline-block;
             padding: 4px 12px;
             border-radius: 20px;
             font-size: 12px;
             font-weight: bold;
-        }}
+        }
         
-        .tree-controls {{
+        .tree-controls {
             display: flex;
             gap: 10px;
-        }}
+        }
         
-        .zoom-controls {{
+        .zoom-controls {
             display: flex;
             gap: 5px;
             align-items: center;
-        }}
+        }
         
-        .zoom-btn {{
+        .zoom-btn {
             background: #007bff;
             color: white;
             border: none;
@@ -875,140 +1428,130 @@ class EnhancedBranchBTAnalyzer:
             border-radius: 4px;
             cursor: pointer;
             font-size: 12px;
-        }}
+        }
         
-        .zoom-btn:hover {{
+        .zoom-btn:hover {
             background: #0056b3;
-        }}
+        }
         
-        .zoom-level {{
+        .zoom-level {
             font-size: 12px;
             color: #666;
             min-width: 40px;
             text-align: center;
-        }}
+        }
         
-        .badge-modified {{ background: #fff3cd; color: #856404; }}
-        .badge-added {{ background: #d4edda; color: #155724; }}
-        .badge-removed {{ background: #f8d7da; color: #721c24; }}
-        .badge-error {{ background: #f8d7da; color: #721c24; }}
+        .badge-modified { background: #fff3cd; color: #856404; }
+        .badge-added { background: #d4edda; color: #155724; }
+        .badge-removed { background: #f8d7da; color: #721c24; }
+        .badge-error { background: #f8d7da; color: #721c24; }
         
-        .tree-container {{
+        .tree-container {
             display: flex;
             gap: 20px;
             padding: 20px;
             min-height: 500px;
-        }}
+        }
         
-        .tree-panel {{
+        .tree-panel {
             flex: 1;
             background: #fafafa;
             border-radius: 6px;
             padding: 15px;
             position: relative;
-        }}
+        }
         
-        .tree-title {{
+        .tree-title {
             text-align: center;
             margin-bottom: 15px;
             font-weight: bold;
             padding-bottom: 10px;
             border-bottom: 2px solid #dee2e6;
-        }}
+        }
         
-        .tree-svg-container {{
+        .tree-svg-container {
             position: relative;
             overflow: hidden;
             border: 1px solid #ddd;
             border-radius: 4px;
-        }}
+        }
         
-        .tree-svg {{
+        .tree-svg {
             width: 100%;
             height: 450px;
             cursor: move;
-        }}
+        }
         
-        .node circle {{
+        .node circle {
             fill: #fff;
             stroke: #333;
             stroke-width: 2px;
             cursor: pointer;
             transition: all 0.3s ease;
-        }}
+        }
         
-        .node text {{
+        .node text {
             font: 11px sans-serif;
             fill: #333;
             cursor: pointer;
             pointer-events: none;
-        }}
+        }
         
-        .link {{
+        .link {
             fill: none;
             stroke: #ccc;
             stroke-width: 1.5px;
             transition: all 0.3s ease;
-        }}
+        }
         
         /* Node type colors */
-        .node-control circle {{ fill: #e3f2fd; stroke: #2196F3; }}
-        .node-action circle {{ fill: #e8f5e8; stroke: #4CAF50; }}
-        .node-condition circle {{ fill: #fff3e0; stroke: #FF9800; }}
-        .node-decorator circle {{ fill: #f3e5f5; stroke: #9C27B0; }}
-        .node-subtree circle {{ fill: #efebe9; stroke: #795548; }}
+        .node-control circle { fill: #e3f2fd; stroke: #2196F3; }
+        .node-action circle { fill: #e8f5e8; stroke: #4CAF50; }
+        .node-condition circle { fill: #fff3e0; stroke: #FF9800; }
+        .node-decorator circle { fill: #f3e5f5; stroke: #9C27B0; }
+        .node-subtree circle { fill: #efebe9; stroke: #795548; }
         
         /* Enhanced change type colors with glow effect */
-        .node-added circle {{ 
+        .node-added circle { 
             fill: #c8e6c9; 
             stroke: #4CAF50; 
             stroke-width: 4px;
             filter: drop-shadow(0 0 6px #4CAF50);
-            animation: pulse-green 2s infinite;
-        }}
-        .node-removed circle {{ 
+        }
+        .node-removed circle { 
             fill: #ffcdd2; 
             stroke: #f44336; 
             stroke-width: 4px;
             filter: drop-shadow(0 0 6px #f44336);
-            animation: pulse-red 2s infinite;
-        }}
-        .node-modified circle {{ 
+        }
+        .node-modified circle { 
             fill: #fff3cd; 
             stroke: #ffc107; 
             stroke-width: 4px;
             filter: drop-shadow(0 0 6px #ffc107);
-            animation: pulse-yellow 2s infinite;
-        }}
-        .node-moved circle {{ 
+        }
+        .node-moved circle { 
             fill: #bbdefb; 
             stroke: #2196F3; 
             stroke-width: 4px;
             filter: drop-shadow(0 0 6px #2196F3);
-            animation: pulse-blue 2s infinite;
-        }}
-        
-        @keyframes pulse-green {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.1); }}
-        }}
-        
-        @keyframes pulse-red {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.1); }}
-        }}
-        
-        @keyframes pulse-yellow {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.1); }}
-        }}
-        
-        @keyframes pulse-blue {{
-            0%, 100% {{ transform: scale(1); }}
-            50% {{ transform: scale(1.1); }}
-        }}
-        
-        .tooltip {{
+        }
+        
+        /* Pulsing is opt-in (legend checkbox): an endless animation on every changed node
+           keeps the browser repainting long after the page has loaded */
+        .animate .node-added circle,
+        .animate .node-removed circle,
+        .animate .node-modified circle,
+        .animate .node-moved circle {
+            animation: pulse 2s infinite;
+        }
+        
+        @keyframes pulse {
+            0%, 100% { transform: scale(1); }
+            50% { transform: scale(1.1); }
+        }
+        
+        .tooltip {
             position: absolute;
             text-align: left;
             padding: 10px;
@@ -1021,68 +1564,68 @@ class EnhancedBranchBTAnalyzer:
             max-width: 300px;
             z-index: 1000;
             transition: opacity 0.3s;
-        }}
+        }
         
-        .no-changes {{
+        .no-changes {
             text-align: center;
             padding: 40px;
             color: #6c757d;
             font-style: italic;
-        }}
+        }
         
-        .error-section {{
+        .error-section {
             background: #f8d7da;
             color: #721c24;
             padding: 20px;
             border-radius: 6px;
             margin: 10px;
-        }}
+        }
         
-        .changes-summary {{
+        .changes-summary {
             background: #f8f9fa;
             padding: 15px;
             margin: 10px 0;
             border-radius: 6px;
-        }}
+        }
         
-        .change-item {{
+        .change-item {
             margin: 5px 0;
             padding: 5px 10px;
             border-radius: 4px;
             font-family: monospace;
             font-size: 12px;
-        }}
+        }
         
-        .change-added {{ background: #d4edda; color: #155724; }}
-        .change-removed {{ background: #f8d7da; color: #721c24; }}
-        .change-modified {{ background: #fff3cd; color: #856404; }}
-        .change-moved {{ background: #cce7ff; color: #004085; }}
+        .change-added { background: #d4edda; color: #155724; }
+        .change-removed { background: #f8d7da; color: #721c24; }
+        .change-modified { background: #fff3cd; color: #856404; }
+        .change-moved { background: #cce7ff; color: #004085; }
         
         /* SubTree specific styles */
-        .change-subtree {{ 
+        .change-subtree { 
             font-weight: bold; 
             border-left: 4px solid #795548;
             padding-left: 10px !important;
-        }}
-        .change-subtree.change-added {{ 
+        }
+        .change-subtree.change-added { 
             background: #e8f5e8; 
             color: #2e7d32; 
             border-left-color: #4CAF50;
-        }}
-        .change-subtree.change-removed {{ 
+        }
+        .change-subtree.change-removed { 
             background: #ffeaea; 
             color: #c62828; 
             border-left-color: #f44336;
-        }}
-        .change-subtree.change-modified {{ 
+        }
+        .change-subtree.change-modified { 
             background: #fffbf0; 
             color: #e65100; 
             border-left-color: #ff9800;
-        }}
+        }
         
-        .tree-svg.dragging {{
+        .tree-svg.dragging {
             cursor: grabbing;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -1139,7 +1682,11 @@ class EnhancedBranchBTAnalyzer:
             </div>
         </div>
         <div style="text-align: center; margin-top: 10px; font-size: 12px; color: #666;">
-            💡 Tip: 변경된 노드들은 반짝이는 애니메이션과 글로우 효과로 강조됩니다. 마우스를 올려서 상세 정보를 확인하세요!
+            💡 Tip: 변경된 노드들은 글로우 효과로 강조됩니다. 마우스를 올려서 상세 정보를 확인하세요!
+            <label style="margin-left: 10px;">
+                <input type="checkbox" onchange="document.body.classList.toggle('animate', this.checked)">
+                반짝임 애니메이션
+            </label>
         </div>
     </div>
     
@@ -1162,14 +1709,20 @@ class EnhancedBranchBTAnalyzer:
     
     <div id="tooltip" class="tooltip"></div>
     
+    <script id="tree-data" type="application/json">{tree_data}</script>
+    
     <script>
         const tooltip = d3.select("#tooltip");
         
-        function renderTree(data, svgId, title) {{
-            const svg = d3.select(`#${{svgId}}`);
+        function renderTree(data, svgId, title, shared = []) {
+            const svg = d3.select(`#${svgId}`);
             svg.selectAll("*").remove();
             
-            if (!data) {{
+            // Subtrees common to both branches are stored once and referenced as {"$ref": index}
+            const resolve = d => (d && d.$ref !== undefined) ? shared[d.$ref] : d;
+            data = resolve(data);
+            
+            if (!data) {
                 svg.append("text")
                     .attr("x", 200)
                     .attr("y", 200)
@@ -1177,18 +1730,18 @@ class EnhancedBranchBTAnalyzer:
                     .style("fill", "#999")
                     .text("No tree data available");
                 return;
-            }}
+            }
             
             const width = 500;
             const height = 450;
-            const margin = {{top: 30, right: 30, bottom: 30, left: 30}};
+            const margin = {top: 30, right: 30, bottom: 30, left: 30};
             
             // Add zoom behavior
             const zoom = d3.zoom()
                 .scaleExtent([0.5, 3])
-                .on("zoom", function(event) {{
+                .on("zoom", function(event) {
                     g.attr("transform", event.transform);
-                }});
+                });
             
             svg.call(zoom);
             
@@ -1197,7 +1750,7 @@ class EnhancedBranchBTAnalyzer:
             const tree = d3.tree()
                 .size([height - margin.top - margin.bottom, width - margin.left - margin.right]);
             
-            const root = d3.hierarchy(data);
+            const root = d3.hierarchy(data, d => d.children && d.children.map(resolve));
             tree(root);
             
             // Add links with enhanced styling
@@ -1205,47 +1758,47 @@ class EnhancedBranchBTAnalyzer:
                 .data(root.descendants().slice(1))
                 .enter().append("path")
                 .attr("class", "link")
-                .attr("d", d => {{
-                    return `M${{d.y + margin.left}},${{d.x + margin.top}}C${{(d.y + d.parent.y) / 2 + margin.left}},${{d.x + margin.top}} ${{(d.y + d.parent.y) / 2 + margin.left}},${{d.parent.x + margin.top}} ${{d.parent.y + margin.left}},${{d.parent.x + margin.top}}`;
-                }})
-                .style("stroke-width", d => {{
+                .attr("d", d => {
+                    return `M${d.y + margin.left},${d.x + margin.top}C${(d.y + d.parent.y) / 2 + margin.left},${d.x + margin.top} ${(d.y + d.parent.y) / 2 + margin.left},${d.parent.x + margin.top} ${d.parent.y + margin.left},${d.parent.x + margin.top}`;
+                })
+                .style("stroke-width", d => {
                     // Thicker lines for paths with changes
                     return (d.data.changes && d.data.changes.length > 0) ? "3px" : "1.5px";
-                }})
-                .style("stroke", d => {{
+                })
+                .style("stroke", d => {
                     // Color lines based on changes
-                    if (d.data.changes && d.data.changes.length > 0) {{
+                    if (d.data.changes && d.data.changes.length > 0) {
                         const changeType = d.data.changes[0];
-                        switch(changeType) {{
+                        switch(changeType) {
                             case 'added': return '#4CAF50';
                             case 'removed': return '#f44336';
                             case 'modified': return '#ffc107';
                             case 'moved': return '#2196F3';
                             default: return '#ccc';
-                        }}
-                    }}
+                        }
+                    }
                     return '#ccc';
-                }});
+                });
             
             // Add nodes with enhanced styling
             const node = g.selectAll(".node")
                 .data(root.descendants())
                 .enter().append("g")
-                .attr("class", d => {{
-                    let classes = `node node-${{d.data.type}}`;
-                    if (d.data.changes && d.data.changes.length > 0) {{
-                        classes += ` node-${{d.data.changes[0]}}`;
-                    }}
+                .attr("class", d => {
+                    let classes = `node node-${d.data.type}`;
+                    if (d.data.changes && d.data.changes.length > 0) {
+                        classes += ` node-${d.data.changes[0]}`;
+                    }
                     return classes;
-                }})
-                .attr("transform", d => `translate(${{d.y + margin.left}},${{d.x + margin.top}})`)
-                .on("mouseover", function(event, d) {{
-                    let tooltipText = `<strong>${{d.data.name}}</strong><br/>Type: ${{d.data.type}}`;
-                    if (d.data.id) tooltipText += `<br/>ID: ${{d.data.id}}`;
-                    if (d.data.changes && d.data.changes.length > 0) {{
-                        tooltipText += `<br/><strong>Changes:</strong> ${{d.data.changes.join(', ')}}`;
-                    }}
-                    tooltipText += `<br/>Path: ${{d.data.path}}`;
+                })
+                .attr("transform", d => `translate(${d.y + margin.left},${d.x + margin.top})`)
+                .on("mouseover", function(event, d) {
+                    let tooltipText = `<strong>${d.data.name}</strong><br/>Type: ${d.data.type}`;
+                    if (d.data.id) tooltipText += `<br/>ID: ${d.data.id}`;
+                    if (d.data.changes && d.data.changes.length > 0) {
+                        tooltipText += `<br/><strong>Changes:</strong> ${d.data.changes.join(', ')}`;
+                    }
+                    tooltipText += `<br/>Path: ${d.data.path}`;
                     
                     tooltip.transition()
                         .duration(200)
@@ -1253,47 +1806,47 @@ class EnhancedBranchBTAnalyzer:
                     tooltip.html(tooltipText)
                         .style("left", (event.pageX + 15) + "px")
                         .style("top", (event.pageY - 10) + "px");
-                }})
-                .on("mouseout", function() {{
+                })
+                .on("mouseout", function() {
                     tooltip.transition()
                         .duration(500)
                         .style("opacity", 0);
-                }});
+                });
             
             // Add circles with enhanced size for changed nodes
             node.append("circle")
-                .attr("r", d => {{
+                .attr("r", d => {
                     const hasChanges = d.data.changes && d.data.changes.length > 0;
                     return hasChanges ? 8 : 5;
-                }});
+                });
             
             // Add text labels with better positioning
             node.append("text")
                 .attr("dy", ".35em")
                 .attr("x", d => d.children ? -12 : 12)
                 .style("text-anchor", d => d.children ? "end" : "start")
-                .text(d => {{
+                .text(d => {
                     let text = d.data.name;
                     if (text.length > 12) text = text.substring(0, 10) + "...";
                     return text;
-                }})
-                .style("font-size", d => {{
+                })
+                .style("font-size", d => {
                     const hasChanges = d.data.changes && d.data.changes.length > 0;
                     return hasChanges ? "11px" : "10px";
-                }})
-                .style("font-weight", d => {{
+                })
+                .style("font-weight", d => {
                     const hasChanges = d.data.changes && d.data.changes.length > 0;
                     return hasChanges ? "bold" : "normal";
-                }});
+                });
             
             // Add reset zoom button
             const resetBtn = svg.append("g")
                 .attr("class", "reset-zoom")
                 .attr("transform", "translate(10, 10)")
                 .style("cursor", "pointer")
-                .on("click", function() {{
+                .on("click", function() {
                     svg.transition().duration(750).call(zoom.transform, d3.zoomIdentity);
-                }});
+                });
             
             resetBtn.append("rect")
                 .attr("width", 60)
@@ -1309,127 +1862,25 @@ class EnhancedBranchBTAnalyzer:
                 .style("fill", "white")
                 .style("font-size", "11px")
                 .text("Reset Zoom");
-        }}
+        }
         
-        // Initialize all tree visualizations
-        document.addEventListener('DOMContentLoaded', function() {{
-            {tree_init_scripts}
-        }});
+        // Initialize all tree visualizations from the embedded JSON, parsed once
+        document.addEventListener('DOMContentLoaded', function() {
+            const treeData = JSON.parse(document.getElementById('tree-data').textContent);
+            treeData.trees.forEach(entry => {
+                renderTree(entry.source, 'sourceTree' + entry.index, treeData.source_branch, entry.shared);
+                renderTree(entry.target, 'targetTree' + entry.index, treeData.target_branch, entry.shared);
+            });
+        });
     </script>
 </body>
 </html>
         """
-        
-        # Generate tree initialization scripts
-        tree_init_scripts = []
-        for i, analysis in enumerate(file_analyses):
-            if analysis.get('tree_data'):
-                tree_data = analysis['tree_data']
-                tree_init_scripts.append(f"""
-                    renderTree({json.dumps(tree_data['source_tree'])}, 'sourceTree{i}', '{source_branch}');
-                    renderTree({json.dumps(tree_data['target_tree'])}, 'targetTree{i}', '{target_branch}');
-                """)
-        
-        return html_template.format(
-            source_branch=source_branch,
-            target_branch=target_branch,
-            total_files=total_files,
-            files_with_changes=files_with_changes,
-            unchanged_files=total_files - files_with_changes,
-            file_sections='\n'.join(file_sections),
-            tree_init_scripts='\n'.join(tree_init_scripts)
-        )
-    
-    def _generate_file_section(self, analysis: Dict, index: int) -> str:
-        """Generate HTML section for a file with changes"""
-        
-        file_path = analysis['file_path']
-        changes = analysis.get('changes', [])
-        subtree_changes = analysis.get('subtree_changes', [])
-        tree_data = analysis.get('tree_data')
-        change_type = analysis.get('change_type', 'MODIFIED')
-        
-        # Generate changes summary
-        changes_html = ""
-        if changes or subtree_changes:
-            change_items = []
-            
-            # Regular changes
-            for change in changes:
-                change_class = f"change-{change['type'].lower()}"
-                change_items.append(f'<div class="change-item {change_class}">{change["description"]}</div>')
-            
-            # SubTree changes
-            for change in subtree_changes:
-                change_class = "change-subtree"
-                if change['type'] == 'SUBTREE_ADDED':
-                    change_class += " change-added"
-                elif change['type'] == 'SUBTREE_REMOVED':
-                    change_class += " change-removed"
-                elif change['type'] == 'SUBTREE_MODIFIED':
-                    change_class += " change-modified"
-                    
-                change_items.append(f'<div class="change-item {change_class}">🌲 {change["description"]}</div>')
-            
-            changes_html = f'<div class="changes-summary">{"".join(change_items)}</div>'
-        
-        # Generate tree visualization HTML
-        tree_html = ""
-        if tree_data:
-            tree_html = f"""
-            <div class="tree-container">
-                <div class="tree-panel">
-                    <div class="tree-title">🔴 Before ({tree_data.get('source_tree_id', 'Tree')})</div>
-                    <div class="tree-svg-container">
-                        <svg id="sourceTree{index}" class="tree-svg"></svg>
-                    </div>
-                </div>
-                <div class="tree-panel">
-                    <div class="tree-title">🟢 After ({tree_data.get('target_tree_id', 'Tree')})</div>
-                    <div class="tree-svg-container">
-                        <svg id="targetTree{index}" class="tree-svg"></svg>
-                    </div>
-                </div>
-            </div>
-            """
-        else:
-            tree_html = '<div class="no-changes">No tree visualization available</div>'
-        
-        badge_class = f"badge-{change_type.lower()}"
-        
-        return f"""
-        <div class="file-section">
-            <div class="file-header">
-                <h3 class="file-path">{file_path} <span class="change-badge {badge_class}">{change_type}</span></h3>
-            </div>
-            {changes_html}
-            {tree_html}
-        </div>
-        """
-    
-    def _generate_no_change_section(self, analysis: Dict) -> str:
-        """Generate HTML section for files with no changes"""
-        return f"""
-        <div class="file-section">
-            <div class="file-header">
-                <h3 class="file-path">{analysis['file_path']} <span class="change-badge badge-unchanged">UNCHANGED</span></h3>
-            </div>
-            <div class="no-changes">No structural changes detected</div>
-        </div>
-        """
-    
-    def _generate_error_section(self, analysis: Dict) -> str:
-        """Generate HTML section for files with errors"""
-        return f"""
-        <div class="file-section">
-            <div class="file-header">
-                <h3 class="file-path">{analysis['file_path']} <span class="change-badge badge-error">ERROR</span></h3>
-            </div>
-            <div class="error-section">
-                <strong>Analysis Error:</strong> {analysis['error']}
-            </div>
-        </div>
-        """
+
+_REPORT_TEMPLATE_PARTS = _split_template(_minify_styles(_REPORT_TEMPLATE), [
+    'source_branch', 'target_branch', 'total_files', 'files_with_changes',
+    'unchanged_files', 'file_sections', 'tree_data'
+])
 
 def main():
     """Command line interface"""
@@ -1440,6 +1891,8 @@ def main():
     parser.add_argument('target_branch', help='Target branch (e.g., feature/new-feature)')
     parser.add_argument('--output', '-o', help='Output HTML file')
     parser.add_argument('--repo-path', '-r', default='.', help='Path to Git repository (default: current directory)')
+    parser.add_argument('--compress', action='store_true',
+                        help='Write the report gzip-compressed (.html.gz) for storage or serving over HTTP')
     
     args = parser.parse_args()
     
@@ -1447,13 +1900,15 @@ def main():
     
     try:
         output_file = analyzer.analyze_all_changes_with_trees(
-            args.source_branch, args.target_branch, args.output
+            args.source_branch, args.target_branch, args.output, args.compress
         )
         print(f"\n✅ Enhanced analysis complete! Open {output_file} in your browser.")
         
     except Exception as e:
         print(f"❌ Error: {e}")
         return 1
+    finally:
+        analyzer.close()
     
     return 0
 
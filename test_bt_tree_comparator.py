@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Tests for the BehaviorTree XML Structure Comparator
+"""
+
+import copy
+import random
+from collections import Counter
+from bt_tree_parser import BTTreeParser
+from bt_tree_comparator import BTTreeComparator, ChangeType
+
+def _tree(body: str):
+    """Parse a MainTree whose root element is body"""
+    return BTTreeParser().parse_string(
+        f'<root BTCPP_format="4"><BehaviorTree ID="MainTree">{body}</BehaviorTree></root>'
+    )['MainTree']
+
+def _compare(old_body: str, new_body: str):
+    """Compare two MainTrees, returning the comparator and its changes"""
+    comparator = BTTreeComparator()
+    changes = comparator.compare_trees(_tree(old_body), _tree(new_body))
+    return comparator, changes
+
+def _summary(comparator: BTTreeComparator, changes) -> dict:
+    """Return the change counts shown in the diff report summary"""
+    counts = Counter(change.change_type for change in changes)
+    return {
+        'added': counts[ChangeType.ADDED],
+        'removed': counts[ChangeType.REMOVED],
+        'modified': counts[ChangeType.MODIFIED],
+        'moved': counts[ChangeType.MOVED],
+        'unchanged': comparator.unchanged_count
+    }
+
+def test_signature_inside_unchanged_subtree_is_not_unique():
+    """A node whose signature also occurs in a pruned identical subtree is not reported as moved"""
+    # Action ID="Log" occurs twice in each tree, once inside the unchanged "keep" Sequence
+    old = ('<Sequence>'
+           '<Sequence name="keep"><Action ID="Log"/></Sequence>'
+           '<Fallback name="work"><Parallel><Action ID="Log"/></Parallel></Fallback>'
+           '</Sequence>')
+    new = ('<Sequence>'
+           '<Sequence name="keep"><Action ID="Log"/></Sequence>'
+           '<Fallback name="work"><ReactiveSequence><Action ID="Log"/></ReactiveSequence></Fallback>'
+           '</Sequence>')
+
+    comparator, changes = _compare(old, new)
+
+    # Same figures as the comparator gave before identical subtrees were pruned
+    assert _summary(comparator, changes) == {
+        'added': 2, 'removed': 2, 'modified': 0, 'moved': 0, 'unchanged': 5
+    }
+    assert {change.old_path for change in changes if change.change_type == ChangeType.REMOVED} == {
+        "BehaviorTree/Sequence[0]/Fallback[0]/Parallel[0]",
+        "BehaviorTree/Sequence[0]/Fallback[0]/Parallel[0]/Action[@ID='Log']"
+    }
+
+def test_unique_signature_is_moved():
+    """A node whose signature occurs once in each whole tree is still reported as moved"""
+    old = ('<Sequence>'
+           '<Sequence name="keep"><Action ID="Wait"/></Sequence>'
+           '<Fallback name="work"><Parallel><Action ID="Log"/></Parallel></Fallback>'
+           '</Sequence>')
+    new = ('<Sequence>'
+           '<Sequence name="keep"><Action ID="Wait"/></Sequence>'
+           '<Fallback name="work"><ReactiveSequence><Action ID="Log"/></ReactiveSequence></Fallback>'
+           '</Sequence>')
+
+    comparator, changes = _compare(old, new)
+
+    assert _summary(comparator, changes) == {
+        'added': 1, 'removed': 1, 'modified': 0, 'moved': 1, 'unchanged': 5
+    }
+    moved = [change for change in changes if change.change_type == ChangeType.MOVED]
+    assert (moved[0].old_path, moved[0].new_path) == (
+        "BehaviorTree/Sequence[0]/Fallback[0]/Parallel[0]/Action[@ID='Log']",
+        "BehaviorTree/Sequence[0]/Fallback[0]/ReactiveSequence[0]/Action[@ID='Log']"
+    )
+
+def test_matched_siblings_do_not_hide_signatures():
+    """Subtrees paired under mismatched sibling lists still count towards signature uniqueness"""
+    # The root's children do not line up, but the "keep" Sequences still pair up and are identical
+    old = ('<Sequence>'
+           '<Sequence name="keep"><Action ID="Log"/></Sequence>'
+           '<Action ID="Log"/>'
+           '</Sequence>')
+    new = ('<Sequence>'
+           '<Sequence name="keep"><Action ID="Log"/></Sequence>'
+           '<Fallback><Action ID="Log"/></Fallback>'
+           '</Sequence>')
+
+    comparator, changes = _compare(old, new)
+
+    assert _summary(comparator, changes) == {
+        'added': 2, 'removed': 1, 'modified': 0, 'moved': 0, 'unchanged': 4
+    }
+
+def test_shared_paths_compare_by_path_map():
+    """Siblings sharing a tag and ID share a path, and the path is compared once, as its last node"""
+    old = ('<Sequence>'
+           '<Action ID="Log" v="1"/><Action ID="Log" v="2"/>'
+           '<Fallback><Action ID="Wait"/></Fallback>'
+           '</Sequence>')
+    new = ('<Sequence>'
+           '<Action ID="Log" v="1"/><Action ID="Log" v="3"/>'
+           '<Parallel><Action ID="Wait"/></Parallel>'
+           '</Sequence>')
+
+    comparator, changes = _compare(old, new)
+
+    assert _summary(comparator, changes) == {
+        'added': 1, 'removed': 1, 'modified': 1, 'moved': 1, 'unchanged': 2
+    }
+    modified = [change for change in changes if change.change_type == ChangeType.MODIFIED]
+    assert modified[0].attribute_changes == {'v': ('2', '3')}
+
+def _reference_compare(old_root, new_root):
+    """Compare two trees the way the comparator did before it was optimized"""
+    def node_map(root):
+        nodes = {}
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            nodes[node.path] = node
+            stack.extend(reversed(node.children))
+        return nodes
+
+    def signature(node):
+        parts = [f"{attr}={node.attributes[attr]}" for attr in ('ID', 'name', 'sub_tree_name')
+                 if attr in node.attributes]
+        return f"{node.tag}({node.node_type.value}):{':'.join(parts)}"
+
+    old_nodes, new_nodes = node_map(old_root), node_map(new_root)
+    changes, unchanged = [], 0
+    for path in old_nodes.keys() | new_nodes.keys():
+        old_node, new_node = old_nodes.get(path), new_nodes.get(path)
+        if old_node and new_node:
+            attrs = {attr: (old_node.attributes.get(attr, ''), new_node.attributes.get(attr, ''))
+                     for attr in old_node.attributes.keys() | new_node.attributes.keys()}
+            attrs = {attr: values for attr, values in attrs.items() if values[0] != values[1]}
+            if old_node.tag != new_node.tag or old_node.node_type != new_node.node_type or attrs:
+                changes.append(('modified', path, path, tuple(sorted(attrs.items()))))
+            else:
+                unchanged += 1
+        elif old_node:
+            changes.append(('removed', path, None, ()))
+        else:
+            changes.append(('added', None, path, ()))
+
+    old_signatures, new_signatures = {}, {}
+    for path, node in old_nodes.items():
+        old_signatures.setdefault(signature(node), []).append(path)
+    for path, node in new_nodes.items():
+        new_signatures.setdefault(signature(node), []).append(path)
+    for sig, old_paths in old_signatures.items():
+        new_paths = new_signatures.get(sig, [])
+        if len(old_paths) == 1 and len(new_paths) == 1 and old_paths[0] != new_paths[0]:
+            changes = [c for c in changes if not (c[0] == 'removed' and c[1] == old_paths[0])
+                       and not (c[0] == 'added' and c[2] == new_paths[0])]
+            changes.append(('moved', old_paths[0], new_paths[0], ()))
+
+    return sorted(changes, key=repr), unchanged
+
+def _random_node(rng: random.Random, depth: int) -> list:
+    """Build a random [tag, attributes, children] node, with few distinct IDs so they repeat"""
+    if depth < 4 and rng.random() < 0.45:
+        tag = rng.choice(['Sequence', 'Fallback', 'Parallel', 'Retry', 'Inverter'])
+        attrs = {}
+        if rng.random() < 0.3:
+            attrs['ID'] = rng.choice('ABCD')
+        if rng.random() < 0.3:
+            attrs['name'] = rng.choice('xyz')
+        count = rng.randint(1, 4) if tag in ('Sequence', 'Fallback', 'Parallel') else 1
+        return [tag, attrs, [_random_node(rng, depth + 1) for _ in range(count)]]
+
+    attrs = {}
+    node_id = rng.choice('ABCD ').strip()
+    if node_id:
+        attrs['ID'] = node_id
+    if rng.random() < 0.4:
+        attrs['v'] = rng.choice('123')
+    return [rng.choice(['Action', 'Condition', 'SubTree']), attrs, []]
+
+def _random_edit(rng: random.Random, root: list) -> list:
+    """Return a copy of a random tree with one to three nodes removed, inserted, moved or changed"""
+    root = copy.deepcopy(root)
+    for _ in range(rng.randint(1, 3)):
+        nodes = []
+        stack = [(root, None)]
+        while stack:
+            node, parent = stack.pop()
+            nodes.append((node, parent))
+            stack.extend((child, node) for child in node[2])
+
+        node, parent = rng.choice(nodes)
+        edit = rng.random()
+        if edit < 0.25 and parent is not None:
+            parent[2].remove(node)
+        elif edit < 0.5:
+            node[2].insert(rng.randint(0, len(node[2])), _random_node(rng, 3))
+        elif edit < 0.75 and parent is not None:
+            parent[2].remove(node)
+            target = rng.choice(nodes)[0]
+            if target is node or target is parent:
+                target = root
+            target[2].insert(rng.randint(0, len(target[2])), node)
+        else:
+            node[1] = dict(node[1], v=rng.choice('1234'))
+    return root
+
+def _to_xml(node: list) -> str:
+    """Serialize a [tag, attributes, children] node"""
+    tag, attrs, children = node
+    attr_text = ''.join(f' {name}="{value}"' for name, value in attrs.items())
+    return f"<{tag}{attr_text}>{''.join(_to_xml(child) for child in children)}</{tag}>"
+
+def test_matches_reference_comparator():
+    """Changes and unchanged counts match the unoptimized comparator on random edits"""
+    for seed in range(1, 401):
+        rng = random.Random(seed)
+        old = ['Sequence', {}, [_random_node(rng, 1) for _ in range(rng.randint(1, 4))]]
+        new = _random_edit(rng, old)
+        old_root, new_root = _tree(_to_xml(old)), _tree(_to_xml(new))
+
+        comparator = BTTreeComparator()
+        changes = comparator.compare_trees(old_root, new_root)
+        actual = sorted(((c.change_type.value, c.old_path, c.new_path,
+                          tuple(sorted(c.attribute_changes.items()))
+                          if c.change_type == ChangeType.MODIFIED else ())
+                         for c in changes), key=repr)
+
+        assert (actual, comparator.unchanged_count) == _reference_compare(old_root, new_root), seed
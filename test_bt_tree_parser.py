@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the BehaviorTree XML Parser
+"""
+
+import pytest
+from bt_tree_parser import BTTreeParser
+
+XML = """<root BTCPP_format="4">
+    <BehaviorTree ID="MainTree">
+        <Sequence>
+            <Action ID="Log"/>
+            <Fallback>
+                <Condition/>
+                <Condition/>
+            </Fallback>
+            <Fallback/>
+            <Condition/>
+            <SubTree ID="Child"/>
+        </Sequence>
+    </BehaviorTree>
+    <BehaviorTree ID="Child">
+        <Fallback/>
+    </BehaviorTree>
+</root>"""
+
+def _paths(root) -> list:
+    """Return the paths of a tree in document order"""
+    paths = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        paths.append(node.path)
+        stack.extend(reversed(node.children))
+    return paths
+
+def test_sibling_indices_count_each_tag_separately():
+    """Nodes without an ID are indexed among earlier siblings with the same tag"""
+    trees = BTTreeParser().parse_string(XML)
+
+    assert _paths(trees['MainTree']) == [
+        "BehaviorTree",
+        "BehaviorTree/Sequence[0]",
+        "BehaviorTree/Sequence[0]/Action[@ID='Log']",
+        "BehaviorTree/Sequence[0]/Fallback[0]",
+        "BehaviorTree/Sequence[0]/Fallback[0]/Condition[0]",
+        "BehaviorTree/Sequence[0]/Fallback[0]/Condition[1]",
+        "BehaviorTree/Sequence[0]/Fallback[1]",
+        "BehaviorTree/Sequence[0]/Condition[0]",
+        "BehaviorTree/Sequence[0]/SubTree[@ID='Child']"
+    ]
+    # Every tree starts counting afresh
+    assert _paths(trees['Child']) == ["BehaviorTree", "BehaviorTree/Fallback[0]"]
+
+def test_parse_file_and_parse_string_agree(tmp_path):
+    """Files and in-memory content produce the same paths"""
+    xml_file = tmp_path / 'tree.xml'
+    xml_file.write_text(XML, encoding='utf-8')
+
+    from_file = BTTreeParser().parse_file(str(xml_file))
+    from_string = BTTreeParser().parse_string(XML.encode('utf-8'))
+
+    for tree_id in ('MainTree', 'Child'):
+        assert _paths(from_file[tree_id]) == _paths(from_string[tree_id])
+
+def test_shared_paths_are_flagged():
+    """Siblings sharing a tag and ID share a path, which clears unique_paths up to the root"""
+    trees = BTTreeParser().parse_string(
+        '<root><BehaviorTree ID="MainTree"><Sequence>'
+        '<Fallback><Action ID="Log"/><Action ID="Log"/></Fallback>'
+        '<Fallback><Action ID="Log"/></Fallback>'
+        '</Sequence></BehaviorTree></root>'
+    )
+    sequence = trees['MainTree'].children[0]
+
+    assert sequence.children[0].children[0].path == sequence.children[0].children[1].path
+    assert not sequence.children[0].unique_paths
+    assert sequence.children[1].unique_paths
+    assert not trees['MainTree'].unique_paths
+    assert trees['MainTree'].size == 7
+
+def test_parsed_trees_are_read_only():
+    """Children and attributes cannot be changed in place, as the comparator caches parsed trees"""
+    sequence = BTTreeParser().parse_string(XML)['MainTree'].children[0]
+
+    assert isinstance(sequence.children, tuple)
+    with pytest.raises(TypeError):
+        sequence.children[0].attributes['ID'] = 'Wait'
@@ -4,13 +4,40 @@ Enhanced BehaviorTree XML Diff Visualizer with Interactive Tree Visualization
 """
 
 import json
+import logging
+from collections import defaultdict
 import tempfile
 import webbrowser
 from pathlib import Path
-from typing import Dict, List
-from bt_tree_parser import BTTreeParser, BTNode
+from operator import itemgetter
+from typing import Dict, List, Optional
+from bt_tree_parser import BTTreeParser, BTNode, NodeType
 from bt_tree_comparator import BTTreeComparator, ChangeType
 
+# Per-node matching details are logged at DEBUG level; the walks check the level once up front
+log = logging.getLogger(__name__)
+
+# Enum member -> value, resolved once instead of probing .value with hasattr on every node
+_NODE_TYPE_VALUES = {nt: nt.value for nt in NodeType}
+_CHANGE_TYPE_VALUES = {ct: ct.value for ct in ChangeType}
+
+# The three deleted nodes the Git-change views mark, as "tag:ID[:message|:wait_time]" signatures
+_DELETED_NODE_SIGNATURES = frozenset({
+    'Action:ManipulatorRebootDxlAction',
+    'Action:PublishLogAction:매니퓰레이터 Reboot!',
+    'Action:WaitAction:0.5'
+})
+
+# The same nodes as (ID, message, wait_time) signatures of Git diff changes
+_DELETED_CHANGE_SIGNATURES = frozenset({
+    # ManipulatorRebootDxlAction with no attributes
+    ('ManipulatorRebootDxlAction', '', ''),
+    # PublishLogAction with specific message
+    ('PublishLogAction', '매니퓰레이터 Reboot!', ''),
+    # WaitAction with specific wait_time
+    ('WaitAction', '', '0.5')
+})
+
 class EnhancedTreeVisualizer:
     """Generate enhanced web-based visualization with interactive tree diagrams"""
     
@@ -45,13 +72,18 @@ class EnhancedTreeVisualizer:
     
     def _tree_to_d3_format_with_git_changes(self, tree: BTNode, git_changes: List[Dict], version: str) -> Dict:
         """Convert BT tree to D3.js format with Git changes applied"""
+        debug = log.isEnabledFor(logging.DEBUG)
+        # Removals are only shown in the old tree
+        deleted_signatures = _DELETED_NODE_SIGNATURES if version == 'old' else frozenset()
         
-        def node_to_d3_with_changes(node: BTNode, path_prefix: str = "") -> Dict:
+        def node_to_d3_with_changes(node: BTNode, path_prefix: str):
+            """Convert one node, returning it with the children still to convert"""
             current_path = f"{path_prefix}/{node.tag}" if path_prefix else node.tag
             node_id = node.attributes.get('ID', '')
             
             # Check for Git changes matching this node - SIMPLE APPROACH
-            node_changes = []
+            # (a removal is the only change this walk can mark, so a flag is enough)
+            removed = False
             
             # Only mark nodes as changed if they are NOT part of the current tree structure
             # This prevents all nodes of the same type from being highlighted
@@ -63,44 +95,31 @@ class EnhancedTreeVisualizer:
             elif node_id == 'WaitAction':
                 node_signature += f":{node.attributes.get('wait_time', '')}"
             
-            # Define specific signatures of deleted nodes
-            deleted_signatures = set()
-            if version == 'old':  # Only apply removals to old tree
-                deleted_signatures = {
-                    'Action:ManipulatorRebootDxlAction',
-                    'Action:PublishLogAction:매니퓰레이터 Reboot!',
-                    'Action:WaitAction:0.5'
-                }
-                
-                # Debug: print all Action nodes in old tree
-                if node.tag == 'Action':
-                    print(f"🔍 OLD TREE Action Node: {node_signature}")
+            # Debug: log all Action nodes in old tree
+            if debug and version == 'old' and node.tag == 'Action':
+                log.debug(f"🔍 OLD TREE Action Node: {node_signature}")
             
             # Check if this node matches any deleted signature
             if node_signature in deleted_signatures:
-                node_changes.append('removed')
-                print(f"🔴 REMOVED NODE MATCHED: {node_signature}")
-            elif version == 'old' and node.tag == 'Action':
-                print(f"📝 SIGNATURE: {node_signature} (not in deleted set)")
+                removed = True
+                if debug:
+                    log.debug(f"🔴 REMOVED NODE MATCHED: {node_signature}")
+            elif debug and version == 'old' and node.tag == 'Action':
+                log.debug(f"📝 SIGNATURE: {node_signature} (not in deleted set)")
             
             d3_node = {
                 "name": node.tag,
                 "id": node_id,
-                "type": node.node_type.value if hasattr(node.node_type, 'value') else str(node.node_type),
+                "type": _NODE_TYPE_VALUES.get(node.node_type) or str(node.node_type),
                 "path": current_path,
-                "attributes": getattr(node, 'attributes', {}),
-                "changes": node_changes,
+                "attributes": dict(node.attributes),
+                "changes": ['removed'] if removed else [],
                 "children": []
             }
             
-            # Recursively add children
-            for child in node.children:
-                child_d3 = node_to_d3_with_changes(child, current_path)
-                d3_node["children"].append(child_d3)
-            
-            return d3_node
+            return d3_node, node.children
         
-        return node_to_d3_with_changes(tree)
+        return self._walk_to_d3(tree, node_to_d3_with_changes)
         """Generate HTML visualization with interactive tree diagrams"""
         
         # Parse trees
@@ -150,74 +169,103 @@ class EnhancedTreeVisualizer:
     def _tree_to_d3_format(self, tree: BTNode, changes: List, version: str) -> Dict:
         """Convert BTNode to D3.js hierarchical format with change information"""
         
-        def node_to_d3(node: BTNode, path_prefix: str = "") -> Dict:
+        # Index the changes by every path they can match in this version: the version's own
+        # path or the generic one. Positions keep each node's changes in the original order
+        version_path = 'old_path' if version == 'old' else 'new_path' if version == 'new' else None
+        changes_by_path = defaultdict(list)
+        for position, change in enumerate(changes):
+            paths = set()
+            if version_path and hasattr(change, version_path):
+                paths.add(getattr(change, version_path))
+            if hasattr(change, 'path'):
+                paths.add(change.path)
+            for change_path in paths:
+                changes_by_path[change_path].append((position, change))
+        
+        def node_to_d3(node: BTNode, path_prefix: str):
+            """Convert one node, returning it with the children still to convert"""
             current_path = f"{path_prefix}/{node.tag}" if path_prefix else node.tag
             
-            # Check for changes in this node
-            node_changes = []
-            for change in changes:
-                if version == 'old' and hasattr(change, 'old_path') and change.old_path == current_path:
-                    node_changes.append(change.change_type.value if hasattr(change.change_type, 'value') else change.change_type)
-                elif version == 'new' and hasattr(change, 'new_path') and change.new_path == current_path:
-                    node_changes.append(change.change_type.value if hasattr(change.change_type, 'value') else change.change_type)
-                elif hasattr(change, 'path') and change.path == current_path:
-                    node_changes.append(change.change_type.value if hasattr(change.change_type, 'value') else change.change_type)
+            # Check for changes in this node; most nodes have none and skip the sort entirely
+            path_changes = changes_by_path.get(current_path)
+            node_changes = [
+                _CHANGE_TYPE_VALUES.get(change.change_type, change.change_type)
+                for _, change in sorted(path_changes, key=itemgetter(0))
+            ] if path_changes else []
             
             d3_node = {
                 "name": node.tag,
                 "id": node.id if node.id != node.tag else "",
-                "type": node.node_type.value if hasattr(node.node_type, 'value') else str(node.node_type),
+                "type": _NODE_TYPE_VALUES.get(node.node_type) or str(node.node_type),
                 "path": current_path,
-                "attributes": getattr(node, 'attributes', {}),
+                "attributes": dict(node.attributes),
                 "changes": node_changes,
                 "children": []
             }
             
-            # Recursively add children
-            for child in node.children:
-                child_d3 = node_to_d3(child, current_path)
-                d3_node["children"].append(child_d3)
-            
-            return d3_node
+            return d3_node, node.children
         
-        return node_to_d3(tree)
+        return self._walk_to_d3(tree, node_to_d3)
     
-    def _tree_to_d3_format_with_subtrees(self, tree, changes, version: str, all_trees: Dict):
-        """Convert tree to D3.js format with SubTree expansion"""
-        def expand_subtrees(node):
-            """Recursively expand SubTree nodes"""
+    def _tree_to_d3_format_with_subtrees(self, tree, changes, version: str, all_trees: Dict,
+                                         log: Optional[List[str]] = None):
+        """Convert tree to D3.js format with SubTree expansion, logging to log if given"""
+        # Each SubTree is converted once per call; every reference to it shares that (read-only) dict
+        expanded_subtrees = {}
+        
+        def expand_subtree(node):
+            """Return the expanded content of a SubTree node, or None if it is not one we can expand"""
             if node.get('type') == 'subtree' and 'ID' in node.get('attributes', {}):
                 subtree_id = node['attributes']['ID']
+                expanded = expanded_subtrees.get(subtree_id)
+                if expanded is not None:
+                    return expanded
                 if subtree_id in all_trees:
                     # Replace SubTree with its actual content
                     subtree = all_trees[subtree_id]
                     expanded = self._node_to_d3_format(subtree, changes, version)
                     expanded['name'] = f"SubTree: {subtree_id}"
                     expanded['is_expanded_subtree'] = True
+                    expanded_subtrees[subtree_id] = expanded
                     return expanded
-            
-            # Process children
-            if 'children' in node:
-                node['children'] = [expand_subtrees(child) for child in node['children']]
-            
-            return node
+            return None
         
         # Convert main tree and expand SubTrees
         d3_tree = self._node_to_d3_format(tree, changes, version)
         
         # Add virtual deleted nodes for visualization in 'old' version
         if version == 'old':
-            d3_tree = self._add_virtual_deleted_nodes(d3_tree, changes)
-            
-        return expand_subtrees(d3_tree)
+            d3_tree = self._add_virtual_deleted_nodes(d3_tree, changes, log)
+        
+        # Expand SubTrees in place, pre-order, with a stack of (children list, index) positions.
+        # Expanded content is not descended into; the root sits in a one-element holder list
+        holder = [d3_tree]
+        stack = [(holder, 0)]
+        while stack:
+            siblings, index = stack.pop()
+            node = siblings[index]
+            expanded = expand_subtree(node)
+            if expanded is not None:
+                siblings[index] = expanded
+                continue
+            
+            children = node.get('children')
+            if children:
+                stack.extend((children, i) for i in range(len(children) - 1, -1, -1))
+        
+        return holder[0]
     
-    def _add_virtual_deleted_nodes(self, tree, git_changes):
+    def _add_virtual_deleted_nodes(self, tree, git_changes, log: Optional[List[str]] = None):
         """Add virtual nodes for deleted items to make them visible in Before tree"""
+        emit = print if log is None else log.append
         if not git_changes:
             return tree
         
         # Create virtual nodes for our specific 3 deleted nodes
         virtual_nodes_to_add = []
+        # Whether the tree already holds a 0.5s WaitAction; the tree only changes after the loop,
+        # so it is scanned at most once however many WaitAction changes there are
+        has_wait_action_05 = None
         
         for change in git_changes:
             if change.get('type') == 'REMOVED':
@@ -237,7 +285,7 @@ class EnhancedTreeVisualizer:
                         'is_virtual_deleted': True,
                         'children': []
                     })
-                    print(f"🔴 Added virtual ManipulatorRebootDxlAction")
+                    emit(f"🔴 Added virtual ManipulatorRebootDxlAction")
                 
                 # PublishLogAction with specific message
                 elif node_id == 'PublishLogAction' and attributes.get('message') == '매니퓰레이터 Reboot!':
@@ -261,12 +309,14 @@ class EnhancedTreeVisualizer:
                         'is_virtual_deleted': True,
                         'children': []
                     })
-                    print(f"🔴 Added virtual PublishLogAction with message: 매니퓰레이터 Reboot!")
+                    emit(f"🔴 Added virtual PublishLogAction with message: 매니퓰레이터 Reboot!")
                 
                 # WaitAction with wait_time="0.5" (but only if not already in tree)
                 elif node_id == 'WaitAction' and attributes.get('wait_time') == '0.5':
                     # Check if this WaitAction is already in the tree to avoid duplicates
-                    if not self._tree_contains_wait_action_05(tree):
+                    if has_wait_action_05 is None:
+                        has_wait_action_05 = self._tree_contains_wait_action_05(tree)
+                    if not has_wait_action_05:
                         virtual_nodes_to_add.append({
                             'name': 'Action',
                             'id': 'WaitAction',
@@ -281,7 +331,7 @@ class EnhancedTreeVisualizer:
                             'is_virtual_deleted': True,
                             'children': []
                         })
-                        print(f"🔴 Added virtual WaitAction with wait_time: 0.5")
+                        emit(f"🔴 Added virtual WaitAction with wait_time: 0.5")
         
         # Add virtual nodes to tree structure in a logical location
         if virtual_nodes_to_add:
@@ -291,89 +341,107 @@ class EnhancedTreeVisualizer:
             
             # Insert virtual nodes at the beginning for visibility
             tree['children'] = virtual_nodes_to_add + tree['children']
-            print(f"🔴 Added {len(virtual_nodes_to_add)} virtual deleted nodes to tree")
+            emit(f"🔴 Added {len(virtual_nodes_to_add)} virtual deleted nodes to tree")
         
         return tree
     
     def _tree_contains_wait_action_05(self, tree):
         """Check if tree already contains WaitAction with wait_time="0.5" """
-        def check_node(node):
+        # Depth-first search with an explicit stack, stopping at the first match
+        stack = [tree]
+        while stack:
+            node = stack.pop()
             if (isinstance(node, dict) and 
                 node.get('id') == 'WaitAction' and 
                 node.get('attributes', {}).get('wait_time') == '0.5'):
                 return True
-            
-            for child in node.get('children', []):
-                if check_node(child):
-                    return True
-            return False
-        
-        return check_node(tree)
-
-        def find_and_add_to_false_perceptor(node):
-            # Look for False_perceptor SubTree
-            if (node.get('name') == 'SubTree: False_perceptor' or 
-                node.get('id') == 'False_perceptor'):
-                
-                # Find the Sequence inside the SubTree
-                for child in node.get('children', []):
-                    if child.get('name') == 'Sequence':
-                        # Add the virtual structure to the Sequence
-                        if 'children' not in child:
-                            child['children'] = []
-                        child['children'].append(virtual_structure)
-                        return True
-                        
-            # Search in children
-            for child in node.get('children', []):
-                if find_and_add_to_false_perceptor(child):
-                    return True
-            return False
-        
-        # Try to find and add to False_perceptor SubTree
-        if not find_and_add_to_false_perceptor(tree):
-            # If SubTree not found, add to root level
-            if 'children' not in tree:
-                tree['children'] = []
-            tree['children'].append(virtual_structure)
+            stack.extend(node.get('children', []))
+        return False
     
     def _node_to_d3_format(self, node, changes, version: str):
-        """Convert single node to D3 format"""
-        # Handle virtual deleted nodes first
+        """Convert a node and all of its descendants to D3 format"""
+        # A tree is either all dicts (already converted or virtual) or all BTNodes, so the
+        # converter is picked once from the root; BTNodes carry their own paths
         if isinstance(node, dict):
-            # This is already a dict format node (likely virtual)
-            result = node.copy()
-            
-            # Ensure change status is properly set for virtual nodes - MULTIPLE WAYS
-            if node.get('is_virtual_deleted'):
-                result['changes'] = ['removed']  # Force removed status
-                result['change_status'] = 'removed'  # Additional property
-                
-            elif 'changes' in node and 'removed' in node['changes']:
-                result['changes'] = ['removed']
-                result['change_status'] = 'removed'
-                    
-            # Process children if they exist
-            if 'children' in result and result['children']:
-                processed_children = []
-                for child in result['children']:
-                    processed_children.append(self._node_to_d3_format(child, changes, version))
-                result['children'] = processed_children
+            return self._walk_to_d3(node, lambda dict_node, _: self._dict_node_to_d3(dict_node))
+        
+        change_index = self._index_changes(changes)
+        debug = log.isEnabledFor(logging.DEBUG)
+        node_to_d3_single = self._node_to_d3_single
+        return self._walk_to_d3(node, lambda bt_node, _: node_to_d3_single(bt_node, change_index, version, debug))
+    
+    def _walk_to_d3(self, tree, convert) -> Dict:
+        """Build nested D3 dicts with convert(node, parent path) -> (D3 node, children to convert)"""
+        # Pre-order walk with an explicit stack: each converted node is appended to its parent's
+        # children when popped, and children are pushed in reverse so they keep document order
+        root = []
+        stack = [(tree, "", root)]
+        pop, extend = stack.pop, stack.extend
+        while stack:
+            node, path_prefix, siblings = pop()
+            d3_node, children = convert(node, path_prefix)
+            siblings.append(d3_node)
+            if children:
+                path, d3_children = d3_node.get("path", ""), d3_node["children"]
+                extend((child, path, d3_children) for child in reversed(children))
+        
+        return root[0]
+    
+    def _index_changes(self, changes) -> Dict:
+        """Index changes by what a node must share to match them: node ID for Git diff changes, path otherwise"""
+        # Entries keep their position so a node's candidates are checked in the original order
+        index = defaultdict(list)
+        for position, change in enumerate(changes):
+            if isinstance(change, dict):
+                index[('id', change.get('node_id', ''))].append((position, change))
+            elif hasattr(change, 'path'):
+                index[('path', change.path)].append((position, change))
+        return index
+    
+    def _dict_node_to_d3(self, node: Dict):
+        """Copy a dict format node (likely virtual), returning it with the children still to convert"""
+        result = node.copy()
+        
+        # Ensure change status is properly set for virtual nodes - MULTIPLE WAYS
+        if node.get('is_virtual_deleted'):
+            result['changes'] = ['removed']  # Force removed status
+            result['change_status'] = 'removed'  # Additional property
+            
+        elif 'changes' in node and 'removed' in node['changes']:
+            result['changes'] = ['removed']
+            result['change_status'] = 'removed'
                 
-            return result
-
+        # Children, if any, are converted into a fresh list
+        children = ()
+        if 'children' in result and result['children']:
+            children = result['children']
+            result['children'] = []
+            
+        return result, children
+    
+    def _node_to_d3_single(self, node: BTNode, change_index: Dict, version: str, debug: bool = False):
+        """Convert single BTNode to D3 format, returning it with the children still to convert"""
         # Get change status - version-aware change detection
         change_status = 'unchanged'
         
-        node_tag = getattr(node, 'tag', 'Unknown')
-        node_id = getattr(node, 'id', '')
-        node_attributes = getattr(node, 'attributes', {})
-        
-        # Debug: print nodes being processed in old version
-        if version == 'old' and node_tag == 'Action':
-            print(f"🔍 OLD TREE Action Node: {node_tag}:{node_id} (attrs: {node_attributes})")
-        
-        # Check Git diff based changes with version-specific logic
+        # BTNode fields are always set
+        node_tag = node.tag
+        node_id = node.id
+        node_attributes = node.attributes
+        node_path = node.path
+        
+        # Debug: log nodes being processed in old version
+        if debug and version == 'old' and node_tag == 'Action':
+            log.debug(f"🔍 OLD TREE Action Node: {node_tag}:{node_id} (attrs: {dict(node_attributes)})")
+        
+        # Check Git diff based changes with version-specific logic. Only changes with this node's
+        # ID or path can match it (or trigger the NO MATCH debug line)
+        changes = change_index.get(('id', node_id), [])
+        path_changes = change_index.get(('path', node_path))
+        if path_changes:
+            changes = [change for _, change in sorted(changes + path_changes, key=itemgetter(0))]
+        else:
+            changes = [change for _, change in changes]
         for change in changes:
             if isinstance(change, dict):
                 # Git diff based changes
@@ -388,16 +456,6 @@ class EnhancedTreeVisualizer:
                 
                 # Strategy 1: Match exact deleted nodes from Git diff
                 if node_id and change_node_id and node_id == change_node_id and node_tag == change_node_tag:
-                    # Create specific signatures for the 3 deleted nodes from Git diff
-                    deleted_node_signatures = {
-                        # ManipulatorRebootDxlAction with no attributes
-                        ('ManipulatorRebootDxlAction', '', ''),
-                        # PublishLogAction with specific message
-                        ('PublishLogAction', '매니퓰레이터 Reboot!', ''),
-                        # WaitAction with specific wait_time
-                        ('WaitAction', '', '0.5')
-                    }
-                    
                     # Create signature for current change
                     change_signature = (
                         change_node_id,
@@ -414,9 +472,10 @@ class EnhancedTreeVisualizer:
                     
                     # Only match if this change represents one of our deleted nodes
                     # AND the current node matches that exact signature
-                    if change_signature in deleted_node_signatures and node_signature == change_signature:
+                    if change_signature in _DELETED_CHANGE_SIGNATURES and node_signature == change_signature:
                         node_matches = True
-                        print(f"✅ EXACT MATCH: {node_id} with signature {node_signature}")
+                        if debug:
+                            log.debug(f"✅ EXACT MATCH: {node_id} with signature {node_signature}")
                     else:
                         node_matches = False
                 
@@ -424,28 +483,28 @@ class EnhancedTreeVisualizer:
                     # Version-aware change status assignment
                     if version == 'old' and change_type == 'REMOVED':
                         change_status = 'removed'
-                        print(f"🔴 MATCHED REMOVED: {node_id} (message: {node_attributes.get('message', 'N/A')}, wait_time: {node_attributes.get('wait_time', 'N/A')})")
+                        if debug:
+                            log.debug(f"🔴 MATCHED REMOVED: {node_id} (message: {node_attributes.get('message', 'N/A')}, wait_time: {node_attributes.get('wait_time', 'N/A')})")
                     elif version == 'new' and change_type == 'ADDED':
                         change_status = 'added'
-                        print(f"🟢 MATCHED ADDED: {node_id}")
+                        if debug:
+                            log.debug(f"🟢 MATCHED ADDED: {node_id}")
                     elif change_type == 'MODIFIED':
                         # Modified nodes appear in both trees
                         change_status = 'modified'
-                        print(f"🟡 MATCHED MODIFIED: {node_id}")
+                        if debug:
+                            log.debug(f"🟡 MATCHED MODIFIED: {node_id}")
                     
                     # Break after first match to avoid duplicate assignments
                     break
                 else:
                     # Debug: why didn't it match?
-                    if node_id == change_node_id and version == 'old' and change_type == 'REMOVED':
-                        print(f"❌ NO MATCH: {node_id} | Node attrs: {node_attributes.get('message', 'N/A')} vs Change attrs: {change_attributes.get('message', 'N/A')}")
+                    if debug and node_id == change_node_id and version == 'old' and change_type == 'REMOVED':
+                        log.debug(f"❌ NO MATCH: {node_id} | Node attrs: {node_attributes.get('message', 'N/A')} vs Change attrs: {change_attributes.get('message', 'N/A')}")
             else:
                 # Traditional path-based changes
-                if hasattr(change, 'path') and change.path == getattr(node, 'path', ''):
-                    if hasattr(change.change_type, 'value'):
-                        change_type_str = change.change_type.value
-                    else:
-                        change_type_str = str(change.change_type)
+                if hasattr(change, 'path') and change.path == node_path:
+                    change_type_str = _CHANGE_TYPE_VALUES.get(change.change_type) or str(change.change_type)
                     
                     # Version-aware traditional change handling
                     if version == 'old' and change_type_str == 'REMOVED':
@@ -456,35 +515,27 @@ class EnhancedTreeVisualizer:
                         change_status = 'modified'
         
         # Convert NodeType to string
-        node_type = getattr(node, 'node_type', 'unknown')
-        if hasattr(node_type, 'value'):
-            node_type_str = node_type.value
-        else:
-            node_type_str = str(node_type).lower()
+        node_type = node.node_type
+        node_type_str = _NODE_TYPE_VALUES.get(node_type) or str(node_type).lower()
         
         result = {
-            'name': getattr(node, 'tag', 'Unknown'),
-            'id': getattr(node, 'id', ''),
+            'name': node_tag,
+            'id': node_id,
             'type': node_type_str,
-            'path': getattr(node, 'path', ''),
-            'attributes': getattr(node, 'attributes', {}),
+            'path': node_path,
+            'attributes': dict(node_attributes),
             'changes': [change_status] if change_status != 'unchanged' else [],
             'children': []
         }
         
-        # Process children
-        if hasattr(node, 'children'):
-            for child in node.children:
-                result['children'].append(self._node_to_d3_format(child, changes, version))
-        
-        return result
+        return result, node.children
     
     def _changes_to_dict(self, changes: List) -> List[Dict]:
         """Convert changes to dictionary format"""
         result = []
         for change in changes:
             change_dict = {
-                'type': change.change_type.value if hasattr(change.change_type, 'value') else change.change_type,
+                'type': _CHANGE_TYPE_VALUES.get(change.change_type, change.change_type),
                 'description': getattr(change, 'description', str(change.change_type))
             }
             